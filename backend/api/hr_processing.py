@@ -22,9 +22,14 @@
 
 from __future__ import annotations
 
+from bisect import bisect_right
 from collections import defaultdict
-from typing import TYPE_CHECKING, Any
+from operator import itemgetter
+from typing import TYPE_CHECKING, Any, NamedTuple, TypeGuard, TypeVar
 
+import numpy as np
+
+from api.hr_processing_kernels import accumulate_zones
 from api.logging import get_logger
 from api.models import ActivityType
 
@@ -46,11 +51,43 @@ MOVING_DISTANCE_THRESHOLDS = defaultdict(
 		ActivityType.DEFAULT: 0.8,
 	},
 )
+# For the handful of zones users typically define, a plain scan beats bisect overhead
+LINEAR_SCAN_MAX_ZONES = 8
+HR_MAX = np.iinfo(np.uint8).max
+STREAM_DTYPES: dict[type[bool | int | float], type[np.generic]] = {
+	int: np.int32,
+	float: np.float64,
+	bool: np.bool_,
+}
+
+_SamplesT = TypeVar("_SamplesT", bound="Sequence[Any] | np.ndarray")
+
+
+class ZoneLookup(NamedTuple):
+	"""Zone definitions of a config prepared for classifying heart rate values.
+
+	``zone_names`` lists all zones in their display order, while the remaining fields
+	only describe valid zones (``min_hr <= max_hr``) sorted by ``min_hr``. A heart rate
+	belongs to the first of those zones containing it, so overlapping bounds are trimmed
+	to the values not already covered by preceding zones, e.g. the value shared by two
+	touching Strava zones stays in the lower one, and fully covered zones are dropped.
+	The bound arrays hold the same bounds in the byte-sized HR dtype the zone kernel
+	consumes, limited to zones starting within that dtype.
+	"""
+
+	zone_names: tuple[str, ...]
+	min_hrs: tuple[int, ...]
+	max_hrs: tuple[int, ...]
+	names: tuple[str, ...]
+	min_bounds: np.ndarray
+	max_bounds: np.ndarray
 
 
 def parse_activity_streams(
 	streams_data: dict[str, Any] | None,
-) -> tuple[list[int] | None, list[int] | None, list[float] | None, list[bool] | None]:
+	*,
+	strict: bool = False,
+) -> tuple[np.ndarray | None, np.ndarray | None, np.ndarray | None, np.ndarray | None]:
 	"""Parse the raw activity stream data from Strava to extract time and heart rate series.
 
 	Parameters
@@ -58,6 +95,9 @@ def parse_activity_streams(
 	streams_data
 	    A dictionary representing the JSON response from the Strava API's
 	    getLoggedInAthleteActivityStreams endpoint, keyed by stream type.
+	strict
+		Type-check every sample instead of only the first and the last one. Strava streams
+		are homogeneous, so the cheap spot-check suffices for its payloads.
 
 	Returns
 	-------
@@ -74,26 +114,40 @@ def parse_activity_streams(
 		logger.warning("No stream data provided to parse.")
 		return None, None, None, None
 
-	time_data = _parse_activity_stream(streams_data, "time")
-	heartrate_data = _parse_activity_stream(streams_data, "heartrate")
-	distance_data = _parse_activity_stream(streams_data, "distance", float)
-	moving_data = _parse_activity_stream(streams_data, "moving", bool)
+	time_data = _parse_activity_stream(streams_data, "time", strict=strict)
+	heartrate_data = _parse_activity_stream(streams_data, "heartrate", strict=strict)
+	if heartrate_data is not None:
+		# Human HR fits into a byte, which keeps the zone tally memory-light
+		heartrate_data = np.clip(heartrate_data, 0, HR_MAX).astype(np.uint8)
+	distance_data = _parse_activity_stream(streams_data, "distance", float, strict=strict)
+	moving_data = _parse_activity_stream(streams_data, "moving", bool, strict=strict)
 
-	return time_data, heartrate_data, distance_data, moving_data  # type: ignore[return-value]
+	return time_data, heartrate_data, distance_data, moving_data
 
 
 def _parse_activity_stream(
-	data_streams: dict[str, Any], stream_type: str, expected_type: type[bool | int | float] = int
-) -> list[int] | list[bool] | list[float] | None:
+	data_streams: dict[str, Any],
+	stream_type: str,
+	expected_type: type[bool | int | float] = int,
+	*,
+	strict: bool = False,
+) -> np.ndarray | None:
 	stream = data_streams.get(stream_type)
 	if isinstance(stream, dict) and isinstance(stream.get("data"), list):
 		if not (data := stream["data"]):
 			logger.warning(f"{stream_type.capitalize()} stream data array is empty.")
 			return None
-		if not all(isinstance(t, expected_type) for t in data):
-			logger.warning(f"{stream_type.capitalize()} stream data contains non-integer values.")
-			return None
-		return data
+		# The typed cast below rejects values it cannot convert (e.g. strings) on its own
+		samples = data if strict else (data[0], data[-1])
+		if all(isinstance(t, expected_type) for t in samples):
+			try:
+				return np.asarray(data, dtype=STREAM_DTYPES[expected_type])
+			except (TypeError, ValueError, OverflowError):
+				pass
+		logger.warning(
+			f"{stream_type.capitalize()} stream data contains non-{expected_type.__name__} values."
+		)
+		return None
 
 	logger.warning(f"{stream_type.capitalize()} stream not found or data is not a list.")
 	return None
@@ -112,7 +166,7 @@ def determine_hr_zone(hr_value: int, zones_config: CustomZonesConfig | None) ->
 		return None
 
 	try:
-		all_zones = list(zones_config.zones_definition.order_by("min_hr"))
+		lookup = _prepare_zone_lookup(zones_config)
 	except Exception as e:
 		err_msg = (
 			f"Error accessing or sorting zones for user {zones_config.user_id}, "
@@ -121,44 +175,102 @@ def determine_hr_zone(hr_value: int, zones_config: CustomZonesConfig | None) ->
 		logger.error(err_msg)
 		return None
 
-	if not all_zones:
+	if not lookup.names:
 		logger.warning(
 			f"No heart rate zones defined for user {zones_config.user_id}, "
 			f"activity type {zones_config.activity_type}."
 		)
 		return None
 
-	for zone in all_zones:
-		if not isinstance(zone.min_hr, int) or not isinstance(zone.max_hr, int):
-			continue
-		if zone.min_hr > zone.max_hr:
-			continue
-		if zone.min_hr <= hr_value <= zone.max_hr:
-			return zone.name
+	zone_idx = _classify_hr(hr_value, lookup)
+	return lookup.names[zone_idx - 1] if zone_idx else None
 
-	# HR value is outside all defined zones
-	return None
+
+def _prepare_zone_lookup(zones_config: CustomZonesConfig) -> ZoneLookup:
+	"""Fetch zones of a config once and prepare them for classification.
+
+	The lookup is memoized on the config instance and rebuilt whenever the config's
+	``updated_at`` changes, so repeated classification does not hit the database. Zones
+	prefetched via ``prefetch_related("zones_definition")`` are used without a query.
+	"""
+	cached: tuple[Any, ZoneLookup] | None = getattr(zones_config, "_zone_lookup", None)
+	if cached is not None and cached[0] == zones_config.updated_at:
+		return cached[1]
+
+	if "zones_definition" in getattr(zones_config, "_prefetched_objects_cache", {}):
+		# Prefetched zones are already in the model's default ``order`` ordering
+		zones = zones_config.zones_definition.all()
+		zone_rows = [(zone.name, zone.min_hr, zone.max_hr) for zone in zones]
+	else:
+		zones = zones_config.zones_definition.all().order_by("order")
+		zone_rows = list(zones.values_list("name", "min_hr", "max_hr"))
+	lookup = _build_zone_lookup(zone_rows)
+	zones_config._zone_lookup = (zones_config.updated_at, lookup)  # type: ignore[attr-defined]
+	return lookup
+
+
+def _build_zone_lookup(zone_rows: Sequence[tuple[str, int, int]]) -> ZoneLookup:
+	"""Build a `ZoneLookup` from ``(name, min_hr, max_hr)`` rows in display order."""
+	valid_rows = sorted((row for row in zone_rows if row[1] <= row[2]), key=itemgetter(1))
+	rows: list[tuple[str, int, int]] = []
+	covered_up_to = -1  # Zone bounds are non-negative
+	for name, min_hr, max_hr in valid_rows:
+		if (min_hr := max(min_hr, covered_up_to + 1)) <= max_hr:
+			rows.append((name, min_hr, max_hr))
+			covered_up_to = max_hr
+	min_hrs = tuple(min_hr for _, min_hr, _ in rows)
+	max_hrs = tuple(max_hr for _, _, max_hr in rows)
+	# Zones starting above HR_MAX never match a parsed HR stream, leaving them out keeps the
+	# kernel bounds sorted; zones reaching above HR_MAX are capped at it
+	n_kernel_zones = bisect_right(min_hrs, HR_MAX)
+	max_bounds = np.minimum(np.asarray(max_hrs[:n_kernel_zones], dtype=np.int64), HR_MAX)
+	return ZoneLookup(
+		zone_names=tuple(name for name, _, _ in zone_rows),
+		min_hrs=min_hrs,
+		max_hrs=max_hrs,
+		names=tuple(name for name, _, _ in rows),
+		min_bounds=np.asarray(min_hrs[:n_kernel_zones], dtype=np.uint8),
+		max_bounds=max_bounds.astype(np.uint8),
+	)
+
+
+def _classify_hr(hr_value: int, lookup: ZoneLookup) -> int:
+	"""Return the 1-based position of the zone in ``lookup.names``, 0 when outside all zones."""
+	# Lookup zones do not overlap, so the scan and the bisect always pick the same zone
+	if len(lookup.names) <= LINEAR_SCAN_MAX_ZONES:
+		zones = zip(lookup.min_hrs, lookup.max_hrs, strict=True)
+		for zone_idx, (min_hr, max_hr) in enumerate(zones, start=1):
+			if min_hr <= hr_value <= max_hr:
+				return zone_idx
+		return 0
+
+	zone_idx = bisect_right(lookup.min_hrs, hr_value)
+	if zone_idx == 0 or hr_value > lookup.max_hrs[zone_idx - 1]:
+		return 0
+	return zone_idx
 
 
 def calculate_time_in_zones(
-	time_data: list[int] | None,
-	heartrate_data: list[int] | None,
-	distance_data: list[float] | None,
-	moving_data: list[bool] | None,
-	zones_config: CustomZonesConfig | None,
+	time_data: Sequence[int] | np.ndarray | None,
+	heartrate_data: Sequence[int] | np.ndarray | None,
+	distance_data: Sequence[float] | np.ndarray | None = None,
+	moving_data: Sequence[bool] | np.ndarray | None = None,
+	zones_config: CustomZonesConfig | None = None,
 ) -> dict[str, int]:
 	"""Calculate the total time spent in each custom heart rate zone for an activity.
 
 	Parameters
 	----------
 	time_data
-	    A list of integers representing the time series in seconds (sorted).
+	    A sequence or array of integers representing the time series in seconds (sorted).
 	heartrate_data
-	    A list of integers representing the heart rate series in bpm.
+	    A sequence or array of integers representing the heart rate series in bpm.
 	distance_data
-		A list of floats representing the distance series in meters.
+		A sequence or array of floats representing the distance series in meters.
+		Optional, movement is only evaluated when both distance and moving data are given.
 	moving_data
-	    A list of booleans representing whether the activity was moving at each time point.
+	    A sequence or array of booleans representing whether the activity was moving
+	    at each time point. Optional, see ``distance_data``.
 	zones_config
 	    The CustomZonesConfig object containing the zone definitions.
 
@@ -169,6 +281,7 @@ def calculate_time_in_zones(
 		in seconds. Includes a key for time spent outside any defined zones.
 	"""
 	time_spent_in_zones: dict[str, int] = {OUTSIDE_ZONES_KEY: 0}
+	lookup = _build_zone_lookup(())
 
 	if not zones_config:
 		logger.warning(
@@ -176,17 +289,16 @@ def calculate_time_in_zones(
 		)
 	else:
 		try:
-			for zone_model in zones_config.zones_definition.all().order_by("order"):
-				time_spent_in_zones[zone_model.name] = 0
+			lookup = _prepare_zone_lookup(zones_config)
 		except Exception as e:
 			logger.error(
 				f"Error accessing zone definitions for config {zones_config.id}: {e}. "
 				"Proceeding as if no zones were defined."
 			)
-			# Reset to just OUTSIDE_ZONES_KEY if there was an error fetching actual zones
-			time_spent_in_zones = {OUTSIDE_ZONES_KEY: 0}
+		for zone_name in lookup.zone_names:
+			time_spent_in_zones[zone_name] = 0
 
-	if not time_data or not heartrate_data:
+	if not (_has_samples(time_data) and _has_samples(heartrate_data)):
 		logger.warning("Time or HR data is missing. Cannot calculate time in zones.")
 		return time_spent_in_zones
 
@@ -204,31 +316,55 @@ def calculate_time_in_zones(
 	moving_threshold = MOVING_DISTANCE_THRESHOLDS[
 		zones_config.activity_type if zones_config is not None else ActivityType.DEFAULT
 	]
-	for idx in range(1, len(heartrate_data)):
-		# Skip non-moving times if data available
-		if not _is_moving_datapoint(moving_data, distance_data, moving_threshold, idx):
-			continue
-
-		if (duration := time_data[idx] - time_data[idx - 1]) <= 0:
-			continue
-
-		# Take the average of the current and previous heart rate data points
-		heart_rate = round((heartrate_data[idx] + heartrate_data[idx - 1]) / 2)
-		if zone_name := determine_hr_zone(heart_rate, zones_config):
-			time_spent_in_zones[zone_name] = time_spent_in_zones.get(zone_name, 0) + duration
-		else:
-			time_spent_in_zones[OUTSIDE_ZONES_KEY] += duration
+
+	totals = _tally_zone_times(
+		time_data, heartrate_data, distance_data, moving_data, lookup, moving_threshold
+	)
+	names = (OUTSIDE_ZONES_KEY, *lookup.names)
+	time_spent_in_zones.update(zip(names, totals, strict=True))
 
 	return time_spent_in_zones
 
 
-def _is_moving_datapoint(
-	moving_data: Sequence[bool] | None,
-	distance_data: Sequence[float] | None,
+def _tally_zone_times(
+	time_data: Sequence[int] | np.ndarray,
+	heartrate_data: Sequence[int] | np.ndarray,
+	distance_data: Sequence[float] | np.ndarray | None,
+	moving_data: Sequence[bool] | np.ndarray | None,
+	lookup: ZoneLookup,
 	moving_threshold: float,
-	idx: int,
-) -> bool:
-	# Cannot evaluate if moving/distance data are not available
-	if not (moving_data and distance_data):
-		return True
-	return moving_data[idx] or (distance_data[idx] - distance_data[idx - 1] > moving_threshold)
+) -> list[int]:
+	"""Sum durations per zone, ordered as ``(OUTSIDE_ZONES_KEY, *lookup.names)``.
+
+	Takes only plain arrays and a `ZoneLookup` snapshot, so it never touches the database.
+	"""
+	moving = np.empty(0, dtype=np.bool_)
+	distance = np.empty(0, dtype=np.float64)
+	# Skip non-moving times if data available
+	if _has_samples(moving_data) and _has_samples(distance_data):
+		if len(moving_data) == len(distance_data) == len(time_data):
+			moving = np.asarray(moving_data, dtype=np.bool_)
+			distance = np.asarray(distance_data, dtype=np.float64)
+		else:
+			logger.warning(
+				"Moving or distance data lengths do not match the time data. "
+				"Ignoring movement when calculating time in zones."
+			)
+
+	totals = np.zeros(len(lookup.names) + 1, dtype=np.int64)
+	accumulate_zones(
+		np.asarray(time_data),
+		np.asarray(heartrate_data),
+		distance,
+		moving,
+		lookup.min_bounds,
+		lookup.max_bounds,
+		moving_threshold,
+		totals,
+	)
+	return totals.tolist()
+
+
+def _has_samples(data: _SamplesT | None) -> TypeGuard[_SamplesT]:
+	# Arrays have no unambiguous truth value, hence the explicit length check
+	return data is not None and len(data) > 0
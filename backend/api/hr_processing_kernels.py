@@ -0,0 +1,152 @@
+# MIT License
+#
+# Copyright (c) 2025 Dan Stancl
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from __future__ import annotations
+
+import numpy as np
+
+try:
+	from numba import njit
+except ImportError:  # numba is an optional speed-up, see the `jit` extra
+	njit = None
+
+
+def _accumulate_zones_loop(
+	time: np.ndarray,
+	heartrate: np.ndarray,
+	distance: np.ndarray,
+	moving: np.ndarray,
+	mins: np.ndarray,
+	maxs: np.ndarray,
+	moving_threshold: float,
+	out: np.ndarray,
+) -> None:
+	"""Accumulate durations between consecutive samples into heart rate zone buckets.
+
+	Parameters
+	----------
+	time
+		Time series in seconds.
+	heartrate
+		Heart rate series in bpm, of the same length as ``time``.
+	distance
+		Distance series in meters. Either of the same length as ``time`` or empty
+		when movement should not be evaluated.
+	moving
+		Moving series, following the same rules as ``distance``.
+	mins
+		Lower bounds of non-overlapping zones sorted in ascending order.
+	maxs
+		Upper zone bounds matching ``mins``.
+	moving_threshold
+		Distance in meters between two samples above which the athlete is moving.
+	out
+		Zone totals of length at least ``len(mins) + 1``, updated in place. Bucket 0 collects
+		the time spent outside of all zones, zone ``i`` accumulates into bucket ``i + 1``.
+	"""
+	n_zones = mins.shape[0]
+	has_move_info = moving.shape[0] > 0 and distance.shape[0] > 0
+	for idx in range(1, time.shape[0]):
+		duration = time[idx] - time[idx - 1]
+		# Skipped samples (non-positive duration, not moving) contribute a zero weight rather
+		# than a data-dependent jump; `has_move_info` is loop-invariant and predicts perfectly
+		duration *= duration > 0
+		if has_move_info:
+			duration *= moving[idx] | (distance[idx] - distance[idx - 1] > moving_threshold)
+
+		# Midpoint of consecutive samples rounding halves up, i.e. (a + b + 1) >> 1 without
+		# overflowing the narrow heart rate dtype
+		a, b = heartrate[idx], heartrate[idx - 1]
+		heart_rate = (a >> 1) + (b >> 1) + ((a | b) & 1)
+		# Branchless bisect for the last zone starting at or below the HR, the only candidate
+		# as zones do not overlap: the comparison result scales the step, so the loop body
+		# compiles to conditional moves instead of hard-to-predict jumps
+		lo = 0
+		if n_zones > 0:
+			size = n_zones
+			while size > 1:
+				half = size >> 1
+				lo += half * (mins[lo + half] <= heart_rate)
+				size -= half
+			lo += mins[lo] <= heart_rate
+		# `lo` is the bucket of the matching zone, 0 (outside) when below the lowest one
+		if lo > 0 and heart_rate > maxs[lo - 1]:
+			lo = 0
+		out[lo] += duration
+
+
+def _accumulate_zones_vectorized(
+	time: np.ndarray,
+	heartrate: np.ndarray,
+	distance: np.ndarray,
+	moving: np.ndarray,
+	mins: np.ndarray,
+	maxs: np.ndarray,
+	moving_threshold: float,
+	out: np.ndarray,
+) -> None:
+	"""NumPy counterpart of `_accumulate_zones_loop` used when numba is not installed."""
+	durations = np.diff(time)
+	# Midpoint of consecutive samples rounding halves up, i.e. (a + b + 1) >> 1 without
+	# overflowing the narrow heart rate dtype
+	a, b = heartrate[1:], heartrate[:-1]
+	avg_hr = (a >> 1) + (b >> 1) + ((a | b) & 1)
+
+	valid = durations > 0
+	if moving.size and distance.size:
+		valid &= moving[1:] | (np.diff(distance) > moving_threshold)
+
+	zone_pos = np.searchsorted(mins, avg_hr, side="right")
+	# Position 0 means below the lowest zone, the leading dummy bound keeps indexing valid
+	bounds = np.concatenate((np.zeros(1, dtype=maxs.dtype), maxs))
+	zone_idx = np.where(avg_hr <= bounds[zone_pos], zone_pos, 0)
+	zone_totals = np.bincount(zone_idx[valid], weights=durations[valid], minlength=mins.size + 1)
+	out[: zone_totals.size] += zone_totals.astype(np.int64)
+
+
+accumulate_zones = (
+	njit(cache=True, boundscheck=False)(_accumulate_zones_loop)
+	if njit is not None
+	else _accumulate_zones_vectorized
+)
+
+
+def _warm_up() -> None:
+	"""Compile the kernel for the dtypes of parsed Strava streams ahead of the first activity."""
+	time = np.arange(2, dtype=np.int32)
+	heartrate = np.zeros(2, dtype=np.uint8)
+	bounds = np.zeros(1, dtype=np.uint8)
+	accumulate_zones(
+		time,
+		heartrate,
+		np.zeros(2, dtype=np.float64),
+		np.zeros(2, dtype=np.bool_),
+		bounds,
+		bounds,
+		0.0,
+		np.zeros(2, dtype=np.int64),
+	)
+
+
+if njit is not None:
+	# Loads the on-disk cache (or compiles once) at import instead of inside the first request
+	_warm_up()
@@ -0,0 +1,88 @@
+# MIT License
+#
+# Copyright (c) 2025 Dan Stancl
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template.defaultfilters import pluralize
+
+from api.models import ActivityZoneTimes, StravaUser, ZoneSummary
+
+if TYPE_CHECKING:
+	from argparse import ArgumentParser
+	from typing import Any
+
+
+class Command(BaseCommand):
+	help = (
+		"Rebuild monthly and weekly ZoneSummaries from ActivityZoneTimes. "
+		"Suitable for cron-driven refreshes and backfills."
+	)
+
+	def add_arguments(self, parser: ArgumentParser) -> None:
+		parser.add_argument("--strava-id", type=int, help="Refresh only this Strava athlete.")
+		parser.add_argument("--year", type=int, help="Refresh only months of this year.")
+		parser.add_argument("--month", type=int, choices=range(1, 13), help="Requires --year.")
+
+	def handle(self, *_args: Any, **options: Any) -> None:
+		year, month = options["year"], options["month"]
+		if month is not None and year is None:
+			raise CommandError("--month requires --year.")
+
+		users = StravaUser.objects.all()
+		if (strava_id := options["strava_id"]) is not None:
+			users = users.filter(strava_id=strava_id)
+
+		refreshed = 0
+		for user_profile in users.iterator():
+			activity_months = ActivityZoneTimes.objects.filter(user=user_profile)
+			if year is not None:
+				activity_months = activity_months.filter(activity_date__year=year)
+			if month is not None:
+				activity_months = activity_months.filter(activity_date__month=month)
+			if not (months := list(activity_months.dates("activity_date", "month"))):
+				continue
+
+			# Zone order of the DEFAULT config is shared by all months of the user
+			try:
+				zone_order = ZoneSummary.get_default_zone_order(user_profile)
+			except ValueError as e:
+				self.stderr.write(f"Skipping user {user_profile.strava_id}: {e}")
+				continue
+
+			for activity_month in months:
+				ZoneSummary.bulk_refresh_for_month(
+					user_profile=user_profile,
+					year=activity_month.year,
+					month=activity_month.month,
+					zone_order=zone_order,
+				)
+				refreshed += 1
+
+		self.stdout.write(
+			self.style.SUCCESS(
+				f"Refreshed zone summaries of {refreshed} month{pluralize(refreshed)}."
+			)
+		)
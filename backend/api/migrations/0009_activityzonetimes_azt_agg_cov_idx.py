@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-15 09:12
+from __future__ import annotations
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+	dependencies = [("api", "0008_populate_activity_processing_queue")]
+
+	operations = [
+		migrations.AddIndex(
+			model_name="activityzonetimes",
+			index=models.Index(
+				fields=["user", "activity_date", "zone_name"],
+				include=("duration_seconds", "updated_at"),
+				name="azt_agg_cov_idx",
+			),
+		),
+	]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-15 23:05
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from django.db import migrations
+
+if TYPE_CHECKING:
+	from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+	from django.db.migrations.state import StateApps
+
+
+def analyze_activity_zone_times(
+	apps: StateApps,  # noqa: ARG001
+	schema_editor: BaseDatabaseSchemaEditor,
+) -> None:
+	"""Refresh planner statistics so the covering index is picked up right away."""
+	if schema_editor.connection.vendor == "postgresql":
+		schema_editor.execute("ANALYZE api_activityzonetimes")
+
+
+class Migration(migrations.Migration):
+	dependencies = [("api", "0009_activityzonetimes_azt_agg_cov_idx")]
+
+	operations = [
+		migrations.RemoveIndex(
+			model_name="activityzonetimes",
+			name="api_activit_user_id_83df2e_idx",
+		),
+		migrations.RunPython(analyze_activity_zone_times, migrations.RunPython.noop),
+	]
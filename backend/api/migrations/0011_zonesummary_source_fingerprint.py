@@ -0,0 +1,26 @@
+# Generated by Django 5.2.3 on 2026-10-15 23:40
+from __future__ import annotations
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+	dependencies = [("api", "0010_remove_activityzonetimes_api_activit_user_id_83df2e_idx")]
+
+	operations = [
+		migrations.AddField(
+			model_name="zonesummary",
+			name="source_count",
+			field=models.PositiveIntegerField(blank=True, null=True),
+		),
+		migrations.AddField(
+			model_name="zonesummary",
+			name="source_max_updated_at",
+			field=models.DateTimeField(blank=True, null=True),
+		),
+		migrations.AddField(
+			model_name="zonesummary",
+			name="source_zone_order",
+			field=models.JSONField(blank=True, default=dict),
+		),
+	]
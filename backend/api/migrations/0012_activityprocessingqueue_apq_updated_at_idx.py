@@ -0,0 +1,15 @@
+# Generated by Django 5.2.3 on 2026-10-16 00:20
+from __future__ import annotations
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+	dependencies = [("api", "0011_zonesummary_source_fingerprint")]
+
+	operations = [
+		migrations.AddIndex(
+			model_name="activityprocessingqueue",
+			index=models.Index(fields=["updated_at"], name="apq_updated_at_idx"),
+		),
+	]
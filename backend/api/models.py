@@ -22,19 +22,24 @@
 
 from __future__ import annotations
 
+import logging
 import uuid
-from collections import OrderedDict
-from datetime import datetime, timedelta
-from typing import ClassVar
+from collections import OrderedDict, defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import TYPE_CHECKING, ClassVar
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import models
-from django.db.models import OuterRef, Subquery, Sum
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import ExtractWeek
 from django.utils import timezone
 
 from api.logging import get_logger
-from api.utils import decrypt_data, encrypt_data
+from api.utils import decrypt_data, determine_weeks_in_month, encrypt_data
+
+if TYPE_CHECKING:
+	from collections.abc import Iterable, Mapping
 
 logger = get_logger(__name__)
 
@@ -76,20 +81,36 @@ class StravaUser(models.Model):
 		return "strava_id"
 
 	@property
-	def access_token(self) -> str | None:
-		return decrypt_data(self._access_token)
+	def access_token(self) -> str:
+		return self._decrypt_token("_access_token")
 
 	@access_token.setter
 	def access_token(self, value: str) -> None:
-		self._access_token = encrypt_data(value)
+		self._encrypt_token("_access_token", value)
 
 	@property
-	def refresh_token(self) -> str | None:
-		return decrypt_data(self._refresh_token)
+	def refresh_token(self) -> str:
+		return self._decrypt_token("_refresh_token")
 
 	@refresh_token.setter
 	def refresh_token(self, value: str) -> None:
-		self._refresh_token = encrypt_data(value)
+		self._encrypt_token("_refresh_token", value)
+
+	def _decrypt_token(self, field_name: str) -> str:
+		# Plaintext is memoized together with the ciphertext it was decrypted from, so direct
+		# assignments to the encrypted field and `refresh_from_db` invalidate it too
+		if not (encrypted := getattr(self, field_name)):
+			return ""  # Never authenticated or revoked, nothing to decrypt
+		cached = self.__dict__.get(f"{field_name}_plain")
+		if cached is None or cached[0] != encrypted:
+			cached = (encrypted, decrypt_data(encrypted))
+			self.__dict__[f"{field_name}_plain"] = cached
+		return cached[1]
+
+	def _encrypt_token(self, field_name: str, value: str) -> None:
+		encrypted = encrypt_data(value)
+		setattr(self, field_name, encrypted)
+		self.__dict__[f"{field_name}_plain"] = (encrypted, value or "")
 
 
 class ActivityType(models.TextChoices):
@@ -144,6 +165,16 @@ class HeartRateZone(models.Model):
 			raise ValidationError("Minimum heart rate cannot be greater than maximum heart rate.")
 
 
+SUMMARY_UNIQUE_FIELDS = ["user", "period_type", "year", "period_index"]
+SUMMARY_DATA_FIELDS = [
+	"zone_times_seconds",
+	"source_count",
+	"source_max_updated_at",
+	"source_zone_order",
+	"updated_at",
+]
+
+
 class ZoneSummary(models.Model):
 	"""Store aggregated time-in-zone summaries for specific periods."""
 
@@ -160,6 +191,11 @@ class ZoneSummary(models.Model):
 		default=dict,
 		help_text="JSON containing aggregated time in seconds for each zone name for the period.",
 	)
+	# Fingerprint of the ActivityZoneTimes rows the zone times were calculated from
+	source_count = models.PositiveIntegerField(null=True, blank=True)
+	source_max_updated_at = models.DateTimeField(null=True, blank=True)
+	# Zone order of the DEFAULT config the zone times were ordered by
+	source_zone_order = models.JSONField(default=dict, blank=True)
 	updated_at = models.DateTimeField(auto_now=True)
 
 	class Meta:
@@ -185,14 +221,13 @@ class ZoneSummary(models.Model):
 
 		If not found or empty, calculates it from ActivityZoneTimes and saves it.
 		"""
-		summary, created = cls.objects.get_or_create(
-			user=user_profile,
-			period_type=period_type,
-			year=year,
-			period_index=period_index,
-			defaults={"zone_times_seconds": {}},
-		)
-
+		summary_key = {
+			"user": user_profile,
+			"period_type": period_type,
+			"year": year,
+			"period_index": period_index,
+		}
+		summary = cls.objects.filter(**summary_key).first()
 		activity_filters = cls._construct_activity_filters(
 			user_profile,
 			year,
@@ -201,69 +236,271 @@ class ZoneSummary(models.Model):
 			current_month_view,
 		)
 
-		try:
-			default_config = CustomZonesConfig.objects.get(
-				user=user_profile, activity_type=ActivityType.DEFAULT
+		zone_order = cls.get_default_zone_order(user_profile)
+		# Skip the aggregation when no activity was added, changed or removed and the zones
+		# were neither renamed nor reordered since last time
+		source_count, source_max_updated_at = cls._fingerprint_activities(activity_filters)
+		if summary is not None and (source_count, source_max_updated_at, zone_order) == (
+			summary.source_count,
+			summary.source_max_updated_at,
+			summary.source_zone_order,
+		):
+			# Skip formatting the zone times repr on this hot path unless it is logged
+			if logger.isEnabledFor(logging.INFO):
+				logger.info(
+					f"ZoneSummary for {user_profile.strava_id}, {period_type}, "
+					f"{year}-{period_index} (context: {current_month_view}) fetched. "
+					f"No change in data: {summary.zone_times_seconds}"
+				)
+			return summary, False
+
+		time_in_zones = cls._calculate_aggregated_time_in_zones(activity_filters, zone_order)
+
+		created = summary is None
+		if summary is None:
+			# The upsert also covers a summary inserted concurrently since the lookup above
+			cls.objects.bulk_create(
+				[
+					cls(
+						**summary_key,
+						zone_times_seconds=time_in_zones,
+						source_count=source_count,
+						source_max_updated_at=source_max_updated_at,
+						source_zone_order=zone_order,
+					)
+				],
+				update_conflicts=True,
+				unique_fields=SUMMARY_UNIQUE_FIELDS,
+				update_fields=SUMMARY_DATA_FIELDS,
 			)
-		except CustomZonesConfig.DoesNotExist as e:
-			raise ValueError("Default CustomZonesConfig not found for user") from e
-
-		time_in_zones = cls._calculate_aggregated_time_in_zones(activity_filters, default_config)
-
-		# Update and save only if newly created or if calculated times differ from stored times
-		if created or summary.zone_times_seconds != time_in_zones:
-			if not time_in_zones and not created:
-				# If calculation results in empty and it wasn't just created
-				# (meaning it had data before)
-				# and we now have no data for this specific context, ensure we store empty.
-				pass  # Handled by assignment below
-
-			summary.zone_times_seconds = time_in_zones
-			summary.save()
+			# On a conflict the stored row keeps its own pk rather than the client-side uuid4 of
+			# the instance passed in, so the summary is read back
+			summary = cls.objects.get(**summary_key)
+		else:
+			update_fields = ["source_count", "source_max_updated_at"]
+			# Only a change of the zone times or their order bumps `updated_at`
+			if (time_in_zones, zone_order) != (
+				summary.zone_times_seconds,
+				summary.source_zone_order,
+			):
+				summary.zone_times_seconds = time_in_zones
+				summary.source_zone_order = zone_order
+				update_fields += ["zone_times_seconds", "source_zone_order", "updated_at"]
+			summary.source_count = source_count
+			summary.source_max_updated_at = source_max_updated_at
+			summary.save(update_fields=update_fields)
+
+		if logger.isEnabledFor(logging.INFO):
 			logger.info(
 				f"ZoneSummary for {user_profile.strava_id}, {period_type}, {year}-{period_index} "
 				f"(context: {current_month_view}) updated/created. Data: {time_in_zones}"
 			)
-		elif not created:
-			logger.info(
-				f"ZoneSummary for {user_profile.strava_id}, {period_type}, {year}-{period_index} "
-				f"(context: {current_month_view}) fetched. "
-				f"No change in data: {summary.zone_times_seconds}"
+		return summary, created
+
+	@classmethod
+	def get_existing_for_month(
+		cls, *, user_profile: StravaUser, year: int, month: int, weeks: Iterable[int]
+	) -> dict[tuple[str, int], ZoneSummary]:
+		"""Fetch the stored monthly and weekly summaries of a month in a single query."""
+		summaries = cls.objects.filter(
+			user=user_profile,
+			year=year,
+			period_type__in=[cls.PeriodType.MONTHLY, cls.PeriodType.WEEKLY],
+			period_index__in=[month, *weeks],
+		)
+		return {(summary.period_type, summary.period_index): summary for summary in summaries}
+
+	@classmethod
+	def bulk_refresh_for_month(
+		cls,
+		*,
+		user_profile: StravaUser,
+		year: int,
+		month: int,
+		zone_order: dict[str, int] | None = None,
+	) -> None:
+		"""Recalculate the monthly summary and the weekly summaries (in month context) at once.
+
+		A single aggregation grouped by ISO week and zone name feeds all summaries of the month.
+		Existing summaries are fetched in one query and only new or changed ones are upserted.
+		Callers that already hold ``zone_order`` (see `get_default_zone_order`) can pass it in.
+		"""
+		if zone_order is None:
+			zone_order = cls.get_default_zone_order(user_profile)
+		weeks = determine_weeks_in_month(year, month)
+
+		monthly_totals: dict[str, int] = defaultdict(int)
+		weekly_totals: dict[int, dict[str, int]] = {week: {} for week in weeks}
+		# Fingerprints of the source rows keyed by week, None stands for the whole month
+		source_counts: dict[int | None, int] = defaultdict(int)
+		source_max_updated_at: dict[int | None, datetime] = {}
+		aggregated_times = (
+			ActivityZoneTimes.objects.filter(
+				**cls._construct_activity_filters(
+					user_profile,
+					year,
+					cls.PeriodType.MONTHLY,  # type: ignore[arg-type]
+					month,
+				)
+			)
+			.annotate(week=ExtractWeek("activity_date"))
+			.values_list("week", "zone_name")
+			# Clear Meta.ordering so nothing but the grouping keys can end up in GROUP BY
+			.order_by()
+			.annotate(
+				total_duration=Sum("duration_seconds"),
+				count=Count("*"),
+				max_updated_at=Max("updated_at"),
+			)
+		)
+		for week, zone_name, total_duration, count, max_updated_at in aggregated_times:
+			monthly_totals[zone_name] += total_duration
+			# Days belonging to the last ISO week of the previous year have no weekly summary
+			if week in weekly_totals:
+				weekly_totals[week][zone_name] = total_duration
+			for key in (None, week):
+				source_counts[key] += count
+				source_max_updated_at[key] = max(
+					source_max_updated_at.get(key, max_updated_at), max_updated_at
+				)
+
+		summary_data = {
+			(cls.PeriodType.MONTHLY, month): (
+				cls._order_zone_times(monthly_totals, zone_order),
+				source_counts[None],
+				source_max_updated_at.get(None),
+				zone_order,
+			)
+		}
+		for week, totals in weekly_totals.items():
+			summary_data[cls.PeriodType.WEEKLY, week] = (
+				cls._order_zone_times(totals, zone_order),
+				source_counts[week],
+				source_max_updated_at.get(week),
+				zone_order,
 			)
 
-		return summary, created
+		existing = {
+			(period_type, period_index): tuple(data)
+			for period_type, period_index, *data in cls.objects.filter(
+				user=user_profile,
+				year=year,
+				period_type__in=[cls.PeriodType.MONTHLY, cls.PeriodType.WEEKLY],
+				period_index__in=[month, *weeks],
+			).values_list(
+				"period_type",
+				"period_index",
+				"zone_times_seconds",
+				"source_count",
+				"source_max_updated_at",
+				"source_zone_order",
+			)
+		}
+		summaries = [
+			cls(
+				user=user_profile,
+				period_type=period_type,
+				year=year,
+				period_index=period_index,
+				zone_times_seconds=data[0],
+				source_count=data[1],
+				source_max_updated_at=data[2],
+				source_zone_order=data[3],
+			)
+			for (period_type, period_index), data in summary_data.items()
+			if existing.get((period_type, period_index)) != data
+		]
+		if summaries:
+			cls.objects.bulk_create(
+				summaries,
+				update_conflicts=True,
+				unique_fields=SUMMARY_UNIQUE_FIELDS,
+				update_fields=SUMMARY_DATA_FIELDS,
+			)
+		logger.info(
+			f"Refreshed {len(summaries)} of {len(summary_data)} ZoneSummaries for "
+			f"{user_profile.strava_id}, period {year}-{month:02d}."
+		)
+
+	@staticmethod
+	def get_default_zone_order(user_profile: StravaUser) -> dict[str, int]:
+		"""Map zone names of the user's DEFAULT config to their display order.
+
+		Raises
+		------
+		ValueError
+			If the user has no DEFAULT config.
+		"""
+		zone_rows = CustomZonesConfig.objects.filter(
+			user=user_profile, activity_type=ActivityType.DEFAULT
+		).values_list("zones_definition__name", "zones_definition__order")
+		if not zone_rows:
+			raise ValueError("Default CustomZonesConfig not found for user")
+		# A config without zones yields a single row of NULLs from the outer join
+		return {name: order for name, order in zone_rows if name is not None}
+
+	@staticmethod
+	def _fingerprint_activities(
+		activity_filters: dict[str, datetime | StravaUser],
+	) -> tuple[int, datetime | None]:
+		"""Return the number of matching activity zone times and their latest update."""
+		source = ActivityZoneTimes.objects.filter(**activity_filters).aggregate(
+			count=Count("*"), max_updated_at=Max("updated_at")
+		)
+		return source["count"], source["max_updated_at"]
 
 	@staticmethod
 	def _calculate_aggregated_time_in_zones(
-		activity_filters: dict[str, int | StravaUser], default_config: CustomZonesConfig
+		activity_filters: dict[str, datetime | StravaUser], zone_order: dict[str, int]
 	) -> OrderedDict[str, int]:
 		"""Calculate aggregated time in heart rate zones for a given set of activities.
 
+		Zones of the default config are pivoted into columns of a single aggregate row.
+		Time recorded under other zone names (e.g. renamed zones or zones of activity
+		specific configs) is only grouped by name when the pivot reports some.
+
 		Returns
 		-------
 		time_in_zones
 			Ordered dictionary of zone names and their aggregated duration in seconds.
 		"""
-		hr_zone_order_subquery = HeartRateZone.objects.filter(
-			config=default_config, name=OuterRef("zone_name")
-		).values("order")[:1]
-
-		aggregated_times = (
-			ActivityZoneTimes.objects.filter(**activity_filters)
-			.values("zone_name")
-			.annotate(
-				total_duration=Sum("duration_seconds"),
-				zone_order=Subquery(hr_zone_order_subquery),
-			)
-			.order_by("zone_order", "zone_name")
+		activities = ActivityZoneTimes.objects.filter(**activity_filters)
+		zone_names = list(zone_order)
+		aggregated = activities.aggregate(
+			**{
+				f"z_{idx}": Sum("duration_seconds", filter=Q(zone_name=name))
+				for idx, name in enumerate(zone_names)
+			},
+			other=Sum("duration_seconds", filter=~Q(zone_name__in=zone_names)),
 		)
+		totals = {name: aggregated[f"z_{idx}"] for idx, name in enumerate(zone_names)}
+		if aggregated["other"]:
+			totals.update(
+				activities.exclude(zone_name__in=zone_names)
+				.values_list("zone_name")
+				.order_by()
+				.annotate(total_duration=Sum("duration_seconds"))
+			)
+
+		return ZoneSummary._order_zone_times(totals, zone_order)
+
+	@staticmethod
+	def _order_zone_times(
+		totals: Mapping[str, int | None], zone_order: dict[str, int]
+	) -> OrderedDict[str, int]:
+		"""Drop empty zones and order the rest as in the default config.
 
+		Zones unknown to the default config go last, sorted by name.
+		"""
 		return OrderedDict(
-			{
-				item["zone_name"]: item["total_duration"]
-				for item in aggregated_times
-				if item["total_duration"]
-			}
+			sorted(
+				((name, total) for name, total in totals.items() if total),
+				key=lambda item: (
+					item[0] not in zone_order,
+					zone_order.get(item[0], 0),
+					item[0],
+				),
+			)
 		)
 
 	@staticmethod
@@ -273,15 +510,36 @@ class ZoneSummary(models.Model):
 		period_type: PeriodType,
 		period_index: int | None,
 		current_month_view: int | None = None,
-	) -> dict[str, int | StravaUser]:
-		activity_filters = {"user": user_profile, "activity_date__year": year}
+	) -> dict[str, datetime | StravaUser]:
+		"""Translate a period into a half-open ``activity_date`` range in the current time zone.
+
+		Unlike ``__month`` or ``__week`` lookups, which compile to EXTRACT, a plain range can be
+		served by the ``(user, activity_date)`` prefix of the covering index. Weekly periods stay
+		limited to the calendar ``year`` and, if given, to ``current_month_view``.
+		"""
+		start, end = date(year, 1, 1), date(year + 1, 1, 1)
 		if period_type == ZoneSummary.PeriodType.MONTHLY:
-			activity_filters["activity_date__month"] = period_index
+			start, end = _month_bounds(year, period_index)  # type: ignore[arg-type]
 		elif period_type == ZoneSummary.PeriodType.WEEKLY:
-			activity_filters["activity_date__week"] = period_index
+			try:
+				week_start = date.fromisocalendar(year, period_index, 1)  # type: ignore[arg-type]
+			except ValueError:  # E.g. week 53 of a year with 52 ISO weeks
+				week_start = end
+			start, end = max(start, week_start), min(end, week_start + timedelta(days=7))
 			if current_month_view:  # Apply month context if provided for weekly
-				activity_filters["activity_date__month"] = current_month_view
-		return activity_filters  # type: ignore[return-value]
+				month_start, month_end = _month_bounds(year, current_month_view)
+				start, end = max(start, month_start), min(end, month_end)
+
+		tz = timezone.get_current_timezone()
+		return {
+			"user": user_profile,
+			"activity_date__gte": datetime.combine(start, time.min, tzinfo=tz),
+			"activity_date__lt": datetime.combine(end, time.min, tzinfo=tz),
+		}
+
+
+def _month_bounds(year: int, month: int) -> tuple[date, date]:
+	return date(year, month, 1), date(year + month // 12, month % 12 + 1, 1)
 
 
 class ActivityZoneTimes(models.Model):
@@ -307,7 +565,13 @@ class ActivityZoneTimes(models.Model):
 		ordering = ["-activity_date", "user", "zone_name"]
 		indexes: ClassVar = [
 			models.Index(fields=["user", "activity_id"]),
-			models.Index(fields=["user", "activity_date"]),
+			# Lets ZoneSummary aggregations run as index-only scans (INCLUDE is Postgres-only).
+			# Its (user, activity_date) prefix also serves plain date range lookups.
+			models.Index(
+				fields=["user", "activity_date", "zone_name"],
+				include=["duration_seconds", "updated_at"],
+				name="azt_agg_cov_idx",
+			),
 		]
 		verbose_name = "Activity Zone Time"
 		verbose_name_plural = "Activity Zone Times"
@@ -351,6 +615,8 @@ class ActivityProcessingQueue(models.Model):
 
 	class Meta:
 		ordering = ["updated_at"]
+		# The scheduler dequeues the least recently touched entry
+		indexes: ClassVar = [models.Index(fields=["updated_at"], name="apq_updated_at_idx")]
 		verbose_name = "Activity Processing Queue"
 		verbose_name_plural = "Activity Processing Queues"
 
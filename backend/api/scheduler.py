@@ -25,11 +25,13 @@ from __future__ import annotations
 from datetime import datetime
 
 from apscheduler.schedulers.background import BackgroundScheduler
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 from api.logging import get_logger
 from api.models import ActivityProcessingQueue, StravaUser, ZoneSummary
-from api.utils import determine_weeks_in_month
 from api.worker import Worker
 
 logger = get_logger(__name__)
@@ -37,8 +39,17 @@ logger = get_logger(__name__)
 
 def process_activity_queue() -> None:
 	"""Process the next user in the activity processing queue and update zone summaries."""
-	queue_entry = ActivityProcessingQueue.objects.order_by("updated_at").first()
-	if not queue_entry:
+	# Jobs run outside the request cycle, so expired persistent connections are not
+	# recycled by Django's request signals
+	close_old_connections()
+	try:
+		_process_activity_queue()
+	finally:
+		close_old_connections()
+
+
+def _process_activity_queue() -> None:
+	if not (queue_entry := _dequeue_next_entry()):
 		logger.info("Activity processing queue is empty.")
 		return
 
@@ -57,10 +68,14 @@ def process_activity_queue() -> None:
 			worker.process_user_activities(after_timestamp=after_timestamp)
 		)
 
-		if last_processed_timestamp:
-			_try_update_zone_summaries_for_user_period(
-				user_profile, datetime.fromtimestamp(last_processed_timestamp)
-			)
+		# Aware and in the current time zone, which month/week lookups of summaries use too
+		processed_at = (
+			datetime.fromtimestamp(last_processed_timestamp, tz=timezone.get_current_timezone())
+			if last_processed_timestamp
+			else None
+		)
+		if processed_at:
+			_try_update_zone_summaries_for_user_period(user_profile, processed_at)
 
 		if not more_activities:
 			logger.info(
@@ -69,54 +84,58 @@ def process_activity_queue() -> None:
 			queue_entry.delete()
 
 			# Update Zone Summaries for current month if all activities processed
-			current_time = timezone.now()
-			current_year = current_time.year
-			current_month = current_time.month
-
-			needs_current_month_update = True
-			if last_processed_timestamp:
-				processed_date_for_current_check = datetime.fromtimestamp(last_processed_timestamp)
-				if (
-					processed_date_for_current_check.year == current_year
-					and processed_date_for_current_check.month == current_month
-				):
-					needs_current_month_update = False
-
+			current_time = timezone.localtime()
+			needs_current_month_update = not processed_at or (
+				(processed_at.year, processed_at.month) != (current_time.year, current_time.month)
+			)
 			if needs_current_month_update:
 				_try_update_zone_summaries_for_user_period(user_profile, current_time)
 
-		elif last_processed_timestamp:  # Implies more_activities is True
-			queue_entry.last_processed_activity_start_time = timezone.make_aware(
-				datetime.fromtimestamp(last_processed_timestamp)
+		elif processed_at:  # Implies more_activities is True
+			# Single UPDATE incrementing the counter in SQL, no model save() round-trip
+			ActivityProcessingQueue.objects.filter(pk=queue_entry.pk).update(
+				last_processed_activity_start_time=processed_at,
+				num_processed=Coalesce(F("num_processed"), 0) + processed_in_batch,
+				updated_at=timezone.now(),  # Touch updated_at to signify work done
 			)
-			fields_to_update = ["last_processed_activity_start_time", "updated_at"]
-			if processed_in_batch > 0:
-				# Ensure num_processed is not None before incrementing
-				if queue_entry.num_processed is None:
-					queue_entry.num_processed = 0
-				queue_entry.num_processed += processed_in_batch
-				fields_to_update.append("num_processed")
-
-			queue_entry.updated_at = timezone.now()  # Touch updated_at to signify work done
-			queue_entry.save(update_fields=fields_to_update)
 			logger.info(
 				f"Batch processed for user {user_profile.strava_id}. "
-				f"Next batch will start from {queue_entry.last_processed_activity_start_time}."
+				f"Next batch will start from {processed_at}."
 			)
 		# If last_processed_timestamp is None and more_activities is True,
 		# it means no new activities were found in this run for this user.
-		# The queue_entry is not modified in this case, will be picked up again based on updated_at
+		# The queue_entry was already moved to the tail when dequeued and will be picked up again
 
 	except Exception as e_process:
 		logger.exception(
 			f"Error processing activities for user {user_profile.strava_id}: {e_process}"
 		)
 		# Move to the end of the queue to retry later by updating its timestamp
-		queue_entry.updated_at = timezone.now()
-		queue_entry.save()
+		ActivityProcessingQueue.objects.filter(pk=queue_entry.pk).update(updated_at=timezone.now())
 		# Note: Zone summaries are not updated if activity processing itself fails.
 
 
+def _dequeue_next_entry() -> ActivityProcessingQueue | None:
+	"""Claim the least recently touched queue entry.
+
+	Rows locked by other scheduler processes are skipped, and the claimed entry is moved to
+	the tail of the queue before its lock is released, so concurrent schedulers never pick
+	the same user.
+	"""
+	with transaction.atomic():
+		queue_entry: ActivityProcessingQueue | None = (
+			ActivityProcessingQueue.objects.select_for_update(skip_locked=True, of=("self",))
+			.select_related("user")
+			# Only the athlete ID of the user is needed, skip its encrypted tokens and the rest
+			.only("last_processed_activity_start_time", "updated_at", "user__strava_id")
+			.order_by("updated_at")
+			.first()
+		)
+		if queue_entry:
+			queue_entry.save(update_fields=["updated_at"])  # auto_now moves it to the tail
+	return queue_entry
+
+
 def _update_zone_summaries_for_user_period(
 	user_profile: StravaUser, year: int, month: int
 ) -> None:
@@ -126,21 +145,7 @@ def _update_zone_summaries_for_user_period(
 		f"period {year}-{month:02d}"
 	)
 
-	_, _monthly_created = ZoneSummary.get_or_create_summary(
-		user_profile=user_profile,
-		period_type=ZoneSummary.PeriodType.MONTHLY,  # type: ignore[arg-type]
-		year=year,
-		period_index=month,
-	)
-
-	for week_num in sorted(determine_weeks_in_month(year, month)):
-		_, _weekly_created = ZoneSummary.get_or_create_summary(
-			user_profile=user_profile,
-			period_type=ZoneSummary.PeriodType.WEEKLY,  # type: ignore[arg-type]
-			year=year,
-			period_index=week_num,
-			current_month_view=month,
-		)
+	ZoneSummary.bulk_refresh_for_month(user_profile=user_profile, year=year, month=month)
 	logger.info(
 		f"Scheduler: Finished updating zone summaries for user {user_profile.strava_id}, "
 		f"period {year}-{month:02d}"
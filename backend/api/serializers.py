@@ -24,6 +24,8 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 
 from api.models import ActivityType, CustomZonesConfig, HeartRateZone, ZoneSummary
@@ -31,6 +33,8 @@ from api.models import ActivityType, CustomZonesConfig, HeartRateZone, ZoneSumma
 if TYPE_CHECKING:
 	from typing import Any
 
+ZONES_BATCH_SIZE = 500
+
 
 class HeartRateZoneSerializer(serializers.ModelSerializer):
 	class Meta:
@@ -49,15 +53,19 @@ class CustomZonesConfigSerializer(serializers.ModelSerializer):
 		fields = ["id", "user", "activity_type", "zones_definition", "created_at", "updated_at"]
 		read_only_fields = ["id", "created_at", "updated_at"]
 
+	@transaction.atomic
 	def create(self, validated_data: dict[str, Any]) -> CustomZonesConfig:
 		zones_data = validated_data.pop("zones_definition")
 		# Associate with the authenticated user, not from payload
 		user = self.context["request"].user.strava_profile
 		config = CustomZonesConfig.objects.create(user=user, **validated_data)
-		for zone_data in zones_data:
-			HeartRateZone.objects.create(config=config, **zone_data)
+		HeartRateZone.objects.bulk_create(
+			[HeartRateZone(config=config, **zone_data) for zone_data in zones_data],
+			batch_size=ZONES_BATCH_SIZE,
+		)
 		return config
 
+	@transaction.atomic
 	def update(
 		self, instance: CustomZonesConfig, validated_data: dict[str, Any]
 	) -> CustomZonesConfig:
@@ -67,13 +75,33 @@ class CustomZonesConfigSerializer(serializers.ModelSerializer):
 		instance.save()
 
 		if zones_data is not None:
-			# Simple approach: delete existing and create new ones
-			instance.zones_definition.all().delete()
-			for zone_data in zones_data:
-				HeartRateZone.objects.create(config=instance, **zone_data)
+			self._sync_zones(instance, zones_data)
 
 		return instance
 
+	@staticmethod
+	def _sync_zones(config: CustomZonesConfig, zones_data: list[dict[str, Any]]) -> None:
+		"""Diff the zones by name, so unchanged zones are left untouched."""
+		existing = {zone.name: zone for zone in config.zones_definition.all()}
+		to_create, to_update = [], []
+		for zone_data in zones_data:
+			if (zone := existing.get(zone_data["name"])) is None:
+				to_create.append(HeartRateZone(config=config, **zone_data))
+			elif any(getattr(zone, field) != value for field, value in zone_data.items()):
+				for field, value in zone_data.items():
+					setattr(zone, field, value)
+				# bulk_update bypasses save(), so auto_now is not applied
+				zone.updated_at = timezone.now()
+				to_update.append(zone)
+
+		config.zones_definition.exclude(name__in=[z["name"] for z in zones_data]).delete()
+		HeartRateZone.objects.bulk_update(
+			to_update,
+			fields=["min_hr", "max_hr", "order", "updated_at"],
+			batch_size=ZONES_BATCH_SIZE,
+		)
+		HeartRateZone.objects.bulk_create(to_create, batch_size=ZONES_BATCH_SIZE)
+
 
 class ZoneSummarySerializer(serializers.ModelSerializer):
 	class Meta:
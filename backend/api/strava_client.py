@@ -23,6 +23,8 @@
 from __future__ import annotations
 
 import datetime as dt
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import TYPE_CHECKING
 
 import pytz
@@ -30,9 +32,15 @@ import requests
 from django.conf import settings
 
 from api.logging import get_logger
-from api.utils import decrypt_data
+from api.utils import (
+	build_http_session,
+	closing_db_connection,
+	decrypt_data,
+	parse_json_response,
+)
 
 if TYPE_CHECKING:
+	from collections.abc import Iterator
 	from typing import Any, TypedDict
 
 	from api.models import StravaUser
@@ -57,11 +65,22 @@ STRAVA_API_ACTIVITY_DETAIL_URL_TEMPLATE = f"{STRAVA_API_BASE_URL}/activities/{{a
 
 # Default per_page, Strava API max is 200
 STRAVA_API_MAX_PER_PAGE = 200
+# Pages requested in parallel once the first page turns out to be full
+STRAVA_API_MAX_CONCURRENT_PAGES = 4
+# (connect, read) timeouts in seconds
+STRAVA_API_TIMEOUT = (5, 30)
+# Tokens this close to their expiry are refreshed before use
+TOKEN_EXPIRY_SKEW = dt.timedelta(seconds=60)
+
+# Shared by all clients so connections to Strava are pooled and reused
+_SESSION = build_http_session()
 
 
 class StravaApiClient:
 	def __init__(self, strava_user: StravaUser) -> None:
 		self._strava_user = strava_user
+		# (stored token, decrypted token) so a refreshed token is never served stale
+		self._decrypted_access_token: tuple[str, str] | None = None
 
 	@property
 	def strava_user(self) -> StravaUser:
@@ -69,18 +88,31 @@ class StravaApiClient:
 
 	@property
 	def access_token(self) -> str:
-		if self.strava_user.access_token is None:
+		stored_token = self.strava_user.access_token
+		if not stored_token or self._token_is_expired():
+			# Refreshing upfront saves the round trip of a request doomed to a 401
 			self.refresh_strava_token()
-		if self.strava_user.access_token is None:
+			stored_token = self.strava_user.access_token
+		if not stored_token:
 			raise ValueError("Access token is not available.")
-		return decrypt_data(self.strava_user.access_token)
+		cached = self._decrypted_access_token
+		if cached is None or cached[0] != stored_token:
+			cached = self._decrypted_access_token = (stored_token, decrypt_data(stored_token))
+		return cached[1]
+
+	def _token_is_expired(self) -> bool:
+		expires_at = self.strava_user.token_expires_at
+		return expires_at is None or expires_at <= dt.datetime.now(tz=pytz.UTC) + TOKEN_EXPIRY_SKEW
 
 	@staticmethod
 	def get(
 		url: str, access_token: str, params: dict[str, Any] | None = None
 	) -> requests.Response:
-		return requests.get(
-			url, headers={"Authorization": f"Bearer {access_token}"}, params=params
+		return _SESSION.get(
+			url,
+			headers={"Authorization": f"Bearer {access_token}"},
+			params=params,
+			timeout=STRAVA_API_TIMEOUT,
 		)
 
 	def refresh_strava_token(self) -> bool:
@@ -95,13 +127,15 @@ class StravaApiClient:
 			return False
 
 		try:
-			response = requests.post(
+			response = _SESSION.post(
 				STRAVA_TOKEN_URL,
 				data=self._generate_refresh_token_payload(self.strava_user.refresh_token),
+				timeout=STRAVA_API_TIMEOUT,
 			)
 			response.raise_for_status()
 
-			self._update_strava_user_tokens(self.strava_user, response.json())
+			self._update_strava_user_tokens(self.strava_user, parse_json_response(response))
+			self._decrypted_access_token = None
 			logger.info(
 				f"Successfully refreshed Strava token for user {self.strava_user.strava_id!r}"
 			)
@@ -146,54 +180,7 @@ class StravaApiClient:
 		if after is not None:
 			params["after"] = after
 
-		try:
-			response = self.get(
-				STRAVA_API_ACTIVITIES_URL,
-				access_token=self.access_token,
-				params=params,
-			)
-			response.raise_for_status()
-			return response.json()
-		except requests.exceptions.HTTPError as e:
-			status_code = e.response.status_code if e.response is not None else None
-			text = e.response.text if e.response is not None else "No response body"
-
-			if status_code == 401:
-				logger.info(f"401 for user {self.strava_user.strava_id}. Refreshing token.")
-				if self.refresh_strava_token():
-					logger.info(f"Token refreshed for {self.strava_user.strava_id}. Retrying.")
-					try:
-						response = self.get(
-							STRAVA_API_ACTIVITIES_URL,
-							access_token=self.access_token,
-							params=params,
-						)
-						response.raise_for_status()
-						return response.json()
-					except requests.exceptions.HTTPError as retry_e:
-						retry_status = retry_e.response.status_code if retry_e.response else "N/A"
-						retry_text = retry_e.response.text if retry_e.response else ""
-						logger.error(
-							f"HTTP error on retry for {self.strava_user.strava_id} post-refresh: "
-							f"{retry_status} {retry_text[:50]}"  # Truncate text
-						)
-					except (requests.exceptions.RequestException, ValueError) as retry_general_e:
-						logger.error(
-							f"Error on retry for {self.strava_user.strava_id} post-refresh: "
-							f"{retry_general_e}"
-						)
-				else:
-					logger.error(f"Refresh failed for {self.strava_user.strava_id}. Cannot retry.")
-			else:
-				logger.error(
-					f"HTTP error for {self.strava_user.strava_id} (not 401): "
-					f"{status_code or 'N/A'} {text[:70]}"  # Truncate text
-				)
-		except requests.exceptions.RequestException as e:
-			logger.error(f"Request error for {self.strava_user.strava_id}: {e}")
-		except ValueError as e:
-			logger.error(f"JSON decode error for {self.strava_user.strava_id}: {e}")
-		return None
+		return self._get_json(STRAVA_API_ACTIVITIES_URL, params=params, resource="activities")
 
 	def fetch_athlete_zones(self) -> dict[str, dict[str, Any]] | None:
 		"""Fetch the athlete's defined zones (HR, Power) from Strava.
@@ -210,54 +197,7 @@ class StravaApiClient:
 					f"Cannot retrieve access token for user {self.strava_user.strava_id}."
 				)
 
-		try:
-			response = self.get(STRAVA_API_ATHLETE_ZONES_URL, access_token=self.access_token)
-			response.raise_for_status()
-			return response.json()
-		except requests.exceptions.HTTPError as e:
-			status_code = e.response.status_code if e.response is not None else None
-			text = e.response.text if e.response is not None else "No response body"
-
-			if status_code == 401:
-				logger.info(
-					f"401 fetching zones for user {self.strava_user.strava_id}. Refreshing token."
-				)
-				if self.refresh_strava_token():
-					logger.info(
-						f"Token refreshed for {self.strava_user.strava_id}. Retrying zones fetch."
-					)
-					try:
-						response = self.get(
-							STRAVA_API_ATHLETE_ZONES_URL, access_token=self.access_token
-						)
-						response.raise_for_status()
-						return response.json()
-					except requests.exceptions.HTTPError as retry_e:
-						retry_status = retry_e.response.status_code if retry_e.response else "N/A"
-						retry_text = retry_e.response.text if retry_e.response else ""
-						logger.error(
-							f"Retry HTTP error fetching zones for {self.strava_user.strava_id}: "
-							f"{retry_status} {retry_text[:50]}"
-						)
-					except (requests.exceptions.RequestException, ValueError) as retry_general_e:
-						logger.error(
-							f"Retry error for {self.strava_user.strava_id} (zones): "
-							f"{retry_general_e}"
-						)
-				else:
-					logger.error(
-						f"Refresh failed for {self.strava_user.strava_id}, cannot retry zones."
-					)
-			else:
-				logger.error(
-					f"HTTP error fetching zones for {self.strava_user.strava_id}: "
-					f"{status_code or 'N/A'} {text[:50]}"
-				)
-		except requests.exceptions.RequestException as e:
-			logger.error(f"Request error fetching zones for {self.strava_user.strava_id}: {e}")
-		except ValueError as e:  # Includes JSONDecodeError
-			logger.error(f"JSON decode error fetching zones for {self.strava_user.strava_id}: {e}")
-		return None
+		return self._get_json(STRAVA_API_ATHLETE_ZONES_URL, resource="zones")
 
 	def fetch_all_strava_activities(
 		self,
@@ -279,43 +219,102 @@ class StravaApiClient:
 		    If some activities are fetched before an error, those will be returned.
 		"""
 		all_activities: list[dict[str, Any]] = []
-		page = 1
+		for activities_chunk in self.iter_strava_activity_pages(before=before, after=after):
+			if activities_chunk is None:
+				return all_activities if all_activities else None
+			all_activities.extend(activities_chunk)
+		return all_activities
+
+	def count_strava_activities(
+		self,
+		before: int | None = None,
+		after: int | None = None,
+	) -> int | None:
+		"""Count activities of the authenticated Strava user without keeping them in memory.
+
+		Returns
+		-------
+		    The number of activities, or None if a persistent error occurs before any page
+		    is fetched. Activities fetched before an error are counted.
+		"""
+		total = 0
+		for activities_chunk in self.iter_strava_activity_pages(before=before, after=after):
+			if activities_chunk is None:
+				return total if total else None
+			total += len(activities_chunk)
+		return total
+
+	def iter_strava_activity_pages(
+		self,
+		before: int | None = None,
+		after: int | None = None,
+	) -> Iterator[list[dict[str, Any]] | None]:
+		"""Yield pages of activities for the authenticated Strava user in order.
+
+		Callers can process and drop each page instead of holding the whole history in
+		memory. See ``fetch_all_strava_activities`` for the parameters.
+
+		Yields
+		------
+		    Non-empty lists of activity data as dictionaries. A page that fails to fetch is
+		    yielded as None and ends the iteration.
+		"""
+		fetched_count = 0
 
 		logger.info(
 			f"Starting to fetch all Strava activities for user {self.strava_user.strava_id}."
 		)
 
-		while True:
+		# The first page is fetched on the calling thread so that a token refresh happens at
+		# most once, before any concurrent requests are issued. Most incremental syncs fit on
+		# a single page and never reach the thread pool.
+		pages = [(1, self._fetch_activities_page(1, before, after))]
+		next_page = 2
+
+		fetch_page = closing_db_connection(self._fetch_activities_page)
+		with ThreadPoolExecutor(max_workers=STRAVA_API_MAX_CONCURRENT_PAGES) as executor:
+			while True:
+				for page, activities_chunk in pages:
+					if activities_chunk is None:
+						# An error occurred in fetch_strava_activities (already logged there)
+						# This includes token refresh failures or persistent API errors.
+						logger.error(
+							f"Failed to fetch page {page} for user {self.strava_user.strava_id}. "
+							f"Stopping after {fetched_count} activities fetched so far."
+						)
+						yield None
+						return
+
+					if activities_chunk:
+						fetched_count += len(activities_chunk)
+						yield activities_chunk
+
+					if len(activities_chunk) < STRAVA_API_MAX_PER_PAGE:
+						logger.info(
+							f"No more activities found after page {page} for user "
+							f"{self.strava_user.strava_id}. "
+							f"Total activities fetched: {fetched_count}."
+						)
+						return
+
+				window = range(next_page, next_page + STRAVA_API_MAX_CONCURRENT_PAGES)
+				futures = [
+					(page, executor.submit(fetch_page, page, before, after)) for page in window
+				]
+				pages = [(page, future.result()) for page, future in futures]
+				next_page = window.stop
+
+	def _fetch_activities_page(
+		self, page: int, before: int | None, after: int | None
+	) -> list[dict[str, Any]] | None:
+		if logger.isEnabledFor(logging.DEBUG):
 			logger.debug(
 				f"Fetching page {page} of activities for user {self.strava_user.strava_id} "
 				f"(before={before}, after={after})"
 			)
-			activities_chunk = self.fetch_strava_activities(
-				page=page, per_page=STRAVA_API_MAX_PER_PAGE, before=before, after=after
-			)
-
-			if activities_chunk is None:
-				# An error occurred in fetch_strava_activities (already logged there)
-				# This includes token refresh failures or persistent API errors.
-				logger.error(
-					f"Failed to fetch page {page} for user {self.strava_user.strava_id}. "
-					f"Returning {len(all_activities)} activities fetched so far."
-				)
-				return all_activities if all_activities else None
-
-			if not activities_chunk:
-				logger.info(
-					f"No more activities found on page {page} for user "
-					f"{self.strava_user.strava_id}. "
-					f"Total activities fetched: {len(all_activities)}."
-				)
-				break
-
-			all_activities.extend(activities_chunk)
-
-			page += 1
-
-		return all_activities
+		return self.fetch_strava_activities(
+			page=page, per_page=STRAVA_API_MAX_PER_PAGE, before=before, after=after
+		)
 
 	def fetch_activity_details(self, activity_id: int) -> dict[str, Any] | None:
 		"""Fetch details for a single activity from the Strava API.
@@ -324,19 +323,10 @@ class StravaApiClient:
 		-------
 		A dictionary containing the activity data, or None if an error occurs.
 		"""
-		try:
-			response = self.get(
-				url=STRAVA_API_ACTIVITY_DETAIL_URL_TEMPLATE.format(activity_id=activity_id),
-				access_token=self.access_token,
-			)
-			response.raise_for_status()
-			return response.json()
-		except requests.exceptions.HTTPError as e:
-			logger.error(
-				f"Request error fetching details for activity {activity_id} "
-				f"for user {self.strava_user.strava_id}: {e}"
-			)
-			return None
+		return self._get_json(
+			STRAVA_API_ACTIVITY_DETAIL_URL_TEMPLATE.format(activity_id=activity_id),
+			resource=f"details for activity {activity_id}",
+		)
 
 	def fetch_activity_streams(
 		self, activity_id: int, attempt_refresh: bool = True
@@ -354,51 +344,63 @@ class StravaApiClient:
 		Returns
 		-------
 		        A dictionary containing the stream data (e.g., {'time': {...}, 'heartrate': {...}})
-		        or None if an error occurs or streams are not available.
+		        or None if an error occurs or streams are not available. Pass it to
+		        ``api.hr_processing.parse_activity_streams`` to get typed NumPy arrays of
+		        the samples; stream metadata is not needed downstream.
 		"""
+		return self._get_json(
+			STRAVA_API_STREAMS_URL_TEMPLATE.format(activity_id=activity_id),
+			params={"keys": "heartrate,time,distance,moving", "key_by_type": "true"},
+			resource=f"streams for activity {activity_id}",
+			attempt_refresh=attempt_refresh,
+			raise_on_refresh_failure=True,
+		)
+
+	def _get_json(
+		self,
+		url: str,
+		params: dict[str, Any] | None = None,
+		*,
+		resource: str,
+		attempt_refresh: bool = True,
+		raise_on_refresh_failure: bool = False,
+	) -> Any | None:
+		"""GET a Strava API resource as JSON, refreshing the token and retrying once on a 401.
+
+		Errors are logged and result in None. If the token cannot be refreshed after a 401,
+		a ValueError is raised instead when ``raise_on_refresh_failure`` is set.
+		"""
+		strava_id = self.strava_user.strava_id
+		refreshed = True
 		try:
-			response = self.get(
-				url=STRAVA_API_STREAMS_URL_TEMPLATE.format(activity_id=activity_id),
-				access_token=self.access_token,
-				params={"keys": "heartrate,time,distance,moving", "key_by_type": "true"},
-			)
-			response.raise_for_status()  # Raise HTTPError for bad responses (4XX or 5XX)
-			return response.json()
+			response = self.get(url=url, access_token=self.access_token, params=params)
+			if response.status_code == 401 and attempt_refresh:
+				logger.info(f"401 fetching {resource} for user {strava_id}. Refreshing token.")
+				if refreshed := self.refresh_strava_token():
+					logger.info(f"Token refreshed for {strava_id}. Retrying {resource} fetch.")
+					response = self.get(url=url, access_token=self.access_token, params=params)
+			if refreshed:
+				response.raise_for_status()
+				return parse_json_response(response)
 		except requests.exceptions.HTTPError as e:
-			if e.response is not None and e.response.status_code == 401 and attempt_refresh:
-				logger.warning(
-					f"Token expired/invalid for user {self.strava_user.strava_id} "
-					f"while fetching streams for activity {activity_id}. Attempting refresh."
-				)
-				if self.refresh_strava_token():
-					logger.info(
-						f"Token refreshed. Retrying stream fetch for activity {activity_id}."
-					)
-					return self.fetch_activity_streams(activity_id, attempt_refresh=False)
-				err_msg = (
-					f"Token refresh failed for user {self.strava_user.strava_id}. "
-					f"Cannot fetch streams for activity {activity_id}."
-				)
-				raise ValueError(err_msg) from e
-			if e.response is not None and e.response.status_code == 404:
-				logger.warning(
-					f"Act {activity_id} not found/no streams (user {self.strava_user.strava_id})."
-					f" Details: {e.response.text}"
-				)
+			status_code = e.response.status_code if e.response is not None else "N/A"
+			text = e.response.text if e.response is not None else "No response body"
 			logger.error(
-				f"HTTP err for act {activity_id} (user {self.strava_user.strava_id}): {e}. "
-				f"Response: {e.response.text if e.response else 'N/A'}"
+				f"HTTP error fetching {resource} for user {strava_id}: "
+				f"{status_code} {text[:70]}"  # Truncate text
 			)
+			return None
 		except requests.exceptions.RequestException as e:
-			logger.error(
-				f"Request error fetching streams for activity {activity_id} "
-				f"for user {self.strava_user.strava_id}: {e}"
-			)
+			logger.error(f"Request error fetching {resource} for user {strava_id}: {e}")
+			return None
 		except ValueError as e:  # Includes JSONDecodeError
-			logger.error(
-				f"Error decoding JSON response for activity streams {activity_id} "
-				f"for user {self.strava_user.strava_id}: {e}"
-			)
+			logger.error(f"JSON decode error fetching {resource} for user {strava_id}: {e}")
+			return None
+
+		err_msg = f"Token refresh failed for user {strava_id}. Cannot fetch {resource}."
+		if raise_on_refresh_failure:
+			raise ValueError(err_msg)
+		logger.error(err_msg)
 		return None
 
 	@staticmethod
@@ -412,10 +414,18 @@ class StravaApiClient:
 
 	@staticmethod
 	def _update_strava_user_tokens(strava_user: StravaUser, token_data: dict[str, Any]) -> None:
-		strava_user.access_token = token_data["access_token"]
-		strava_user.refresh_token = token_data["refresh_token"]
+		update_fields = []
+		# Strava often hands back the same refresh token, which is then not re-encrypted
+		for field_name in ("access_token", "refresh_token"):
+			if getattr(strava_user, field_name) != token_data[field_name]:
+				setattr(strava_user, field_name, token_data[field_name])
+				update_fields.append(f"_{field_name}")
 
 		expires_at_timestamp = token_data["expires_at"]
-		strava_user.token_expires_at = dt.datetime.fromtimestamp(expires_at_timestamp, tz=pytz.UTC)
+		expires_at = dt.datetime.fromtimestamp(expires_at_timestamp, tz=pytz.UTC)
+		if strava_user.token_expires_at != expires_at:
+			strava_user.token_expires_at = expires_at
+			update_fields.append("token_expires_at")
 
-		strava_user.save(update_fields=["_access_token", "_refresh_token", "token_expires_at"])
+		if update_fields:
+			strava_user.save(update_fields=update_fields)
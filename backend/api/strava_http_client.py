@@ -24,14 +24,17 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-import requests
-
 from api.logging import get_logger
+from api.utils import build_http_session, parse_json_response
 
 if TYPE_CHECKING:
 	from typing import Any
 
 STRAVA_PUSH_SUBSCRIPTIONS_URL = "https://www.strava.com/api/v3/push_subscriptions"
+# (connect, read) timeouts in seconds
+STRAVA_PUSH_TIMEOUT = (5, 30)
+
+_SESSION = build_http_session()
 
 
 class StravaHttpClient:
@@ -41,17 +44,18 @@ class StravaHttpClient:
 		self.logger = get_logger(__name__)
 
 	def get_subscriptions(self, client_id: str | int, client_secret: str) -> dict[str, Any]:
-		response = requests.get(
+		response = _SESSION.get(
 			STRAVA_PUSH_SUBSCRIPTIONS_URL,
 			params={"client_id": client_id, "client_secret": client_secret},
+			timeout=STRAVA_PUSH_TIMEOUT,
 		)
 		response.raise_for_status()
-		return response.json()
+		return parse_json_response(response)
 
 	def register_subscription(
 		self, client_id: str | int, client_secret: str, callback_url: str, verify_token: str
 	) -> dict[str, Any]:
-		response = requests.post(
+		response = _SESSION.post(
 			STRAVA_PUSH_SUBSCRIPTIONS_URL,
 			params={
 				"client_id": client_id,
@@ -59,19 +63,21 @@ class StravaHttpClient:
 				"callback_url": callback_url,
 				"verify_token": verify_token,
 			},
+			timeout=STRAVA_PUSH_TIMEOUT,
 		)
 		response.raise_for_status()
-		return response.json()
+		return parse_json_response(response)
 
 	def delete_subscription(
 		self, client_id: str | int, client_secret: str, subscription_id: str
 	) -> None:
-		response = requests.delete(
+		response = _SESSION.delete(
 			STRAVA_PUSH_SUBSCRIPTIONS_URL,
 			params={
 				"client_id": client_id,
 				"client_secret": client_secret,
 				"subscription_id": subscription_id,
 			},
+			timeout=STRAVA_PUSH_TIMEOUT,
 		)
 		response.raise_for_status()
@@ -26,16 +26,22 @@ import json
 import unittest.mock
 from datetime import datetime, timedelta
 from importlib import import_module
+from io import StringIO
 from typing import TYPE_CHECKING
 from unittest.mock import MagicMock, patch
-from urllib.parse import urlparse
+from urllib.parse import parse_qs, urlsplit
 
+import numpy as np
 import pytz
 import requests_mock
+from cryptography.fernet import Fernet
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.messages import get_messages, storage
-from django.test import RequestFactory, TestCase, override_settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
@@ -43,12 +49,14 @@ from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase
 
 from api.hr_processing import (
+	LINEAR_SCAN_MAX_ZONES,
 	OUTSIDE_ZONES_KEY,
-	_is_moving_datapoint,
+	_prepare_zone_lookup,
 	calculate_time_in_zones,
 	determine_hr_zone,
 	parse_activity_streams,
 )
+from api.hr_processing_kernels import _accumulate_zones_loop, _accumulate_zones_vectorized
 from api.models import (
 	ActivityType,
 	ActivityZoneTimes,
@@ -57,14 +65,16 @@ from api.models import (
 	StravaUser,
 	ZoneSummary,
 )
+from api.serializers import CustomZonesConfigSerializer
 from api.strava_client import (
 	STRAVA_API_ACTIVITIES_URL,
+	STRAVA_API_MAX_CONCURRENT_PAGES,
 	STRAVA_API_MAX_PER_PAGE,
 	STRAVA_API_STREAMS_URL_TEMPLATE,
 	STRAVA_TOKEN_URL,
 	StravaApiClient,
 )
-from api.utils import decrypt_data, encrypt_data
+from api.utils import decrypt_data, determine_weeks_in_month, encrypt_data, get_fernet
 from api.views import UserHRZonesDisplayView
 from api.worker import Worker
 
@@ -75,47 +85,53 @@ User = get_user_model()
 
 
 class InitialMigrationTests(TestCase):
-	@property
-	def user(self) -> StravaUser:
-		return StravaUser.objects.create(
-			strava_id=12345,
+	@classmethod
+	def setUpTestData(cls) -> None:
+		# Distinct from the user created in test_models_can_be_created
+		cls.user = StravaUser.objects.create(
+			strava_id=54321,
 			_access_token="dummy_encrypted_token",
 			_refresh_token="dummy_encrypted_refresh",
 			token_expires_at=datetime.now(),
 			scope="read,activity:read_all",
 		)
 
-	def test_strava_user_can_be_created(self) -> None:
-		user = StravaUser.objects.create(
-			strava_id=12345,
-			_access_token="dummy_encrypted_token",
-			_refresh_token="dummy_encrypted_refresh",
-			token_expires_at=datetime.now(),
-			scope="read,activity:read_all",
-		)
-		self.assertIsNotNone(user.pk)  # Check if saved
-		self.assertEqual(user.strava_id, 12345)
+	def test_models_can_be_created(self) -> None:
+		with self.subTest(model="StravaUser"):
+			user = StravaUser.objects.create(
+				strava_id=12345,
+				_access_token="dummy_encrypted_token",
+				_refresh_token="dummy_encrypted_refresh",
+				token_expires_at=datetime.now(),
+				scope="read,activity:read_all",
+			)
+			self.assertIsNotNone(user.pk)  # Check if saved
+			self.assertEqual(user.strava_id, 12345)
 
-	def test_zone_config_can_be_created(self) -> None:
-		zone_config = CustomZonesConfig.objects.create(
-			user=self.user, activity_type=ActivityType.RUN
-		)
-		self.assertIsNotNone(zone_config.pk)
-		self.assertEqual(zone_config.activity_type, ActivityType.RUN)
+		with self.subTest(model="CustomZonesConfig"):
+			zone_config = CustomZonesConfig.objects.create(
+				user=self.user, activity_type=ActivityType.RUN
+			)
+			self.assertIsNotNone(zone_config.pk)
+			self.assertEqual(zone_config.activity_type, ActivityType.RUN)
+
+		with self.subTest(model="ZoneSummary"):
+			zone_summary = ZoneSummary.objects.create(
+				user=self.user,
+				period_type=ZoneSummary.PeriodType.WEEKLY,
+				year=2025,
+				period_index=18,
+				zone_times_seconds=json.dumps({"Zone 1": 3600, "Zone 2": 1800}),
+			)
+			self.assertIsNotNone(zone_summary.pk)
+			self.assertEqual(zone_summary.year, 2025)
+			self.assertEqual(zone_summary.period_type, ZoneSummary.PeriodType.WEEKLY)
+			self.assertEqual(zone_summary.period_index, 18)
 
-	def test_summary_can_be_created(self) -> None:
-		zone_summary = ZoneSummary.objects.create(
-			user=self.user,
-			period_type=ZoneSummary.PeriodType.WEEKLY,
-			year=2025,
-			period_index=18,
-			zone_times_seconds=json.dumps({"Zone 1": 3600, "Zone 2": 1800}),
-		)
-		self.assertIsNotNone(zone_summary.pk)
-		self.assertEqual(zone_summary.year, 2025)
-		self.assertEqual(zone_summary.period_type, ZoneSummary.PeriodType.WEEKLY)
-		self.assertEqual(zone_summary.period_index, 18)
 
+# Encrypted once per test run; tests using these never read the plaintext back
+ENCRYPTED_DUMMY_ACCESS_TOKEN = encrypt_data("dummy_access")
+ENCRYPTED_DUMMY_REFRESH_TOKEN = encrypt_data("dummy_refresh")
 
 # Sample Strava API responses
 MOCK_STRAVA_TOKEN_RESPONSE = {
@@ -147,6 +163,14 @@ MOCK_STRAVA_ERROR_RESPONSE = {
 	"message": "Bad Request",
 	"errors": [{"resource": "Application", "field": "client_id", "code": "invalid"}],
 }
+# Activities by page number: a full first page followed by a partial last one
+MOCK_ACTIVITY_PAGES = {
+	1: [{"id": i, "name": f"Act {i}"} for i in range(1, STRAVA_API_MAX_PER_PAGE + 1)],
+	2: [
+		{"id": i, "name": f"Act {i}"}
+		for i in range(STRAVA_API_MAX_PER_PAGE + 1, STRAVA_API_MAX_PER_PAGE + 11)
+	],
+}
 
 
 class AuthViewTests(APITestCase):
@@ -155,12 +179,17 @@ class AuthViewTests(APITestCase):
 		url = reverse("strava_authorize")
 		response = self.client.get(url)
 		self.assertEqual(response.status_code, status.HTTP_302_FOUND)
-		self.assertTrue(response.url.startswith("https://www.strava.com/oauth/authorize"))
-		self.assertIn("client_id=", response.url)
-		self.assertIn("redirect_uri=", response.url)
-		self.assertIn("response_type=code", response.url)
+		redirect = urlsplit(response.url)
+		self.assertEqual(
+			f"{redirect.scheme}://{redirect.netloc}{redirect.path}",
+			"https://www.strava.com/oauth/authorize",
+		)
+		query = parse_qs(redirect.query, keep_blank_values=True)
+		self.assertEqual(query["client_id"], [settings.STRAVA_CLIENT_ID])
+		self.assertTrue(query["redirect_uri"][0].endswith(reverse("strava_callback")))
+		self.assertEqual(query["response_type"], ["code"])
 		# Check combined scope
-		self.assertIn("scope=read%2Cactivity%3Aread_all%2Cprofile%3Aread_all", response.url)
+		self.assertEqual(query["scope"], ["read,activity:read_all,profile:read_all"])
 
 	def test_user_profile_authenticated(self):
 		"""Test retrieving user profile with valid token authentication."""
@@ -169,8 +198,8 @@ class AuthViewTests(APITestCase):
 		_strava_user = StravaUser.objects.create(
 			user=user,
 			strava_id=98765,
-			_access_token=encrypt_data("dummy_access"),
-			_refresh_token=encrypt_data("dummy_refresh"),
+			_access_token=ENCRYPTED_DUMMY_ACCESS_TOKEN,
+			_refresh_token=ENCRYPTED_DUMMY_REFRESH_TOKEN,
 			token_expires_at=timezone.now() + timezone.timedelta(hours=1),
 			scope="read,activity:read_all",
 		)
@@ -268,7 +297,7 @@ class AuthViewTests(APITestCase):
 		self.assertIn(b"Failed to authenticate with Strava.", response.content)
 
 
-class UtilTests(TestCase):
+class UtilTests(SimpleTestCase):
 	def test_encryption_decryption(self) -> None:
 		"""Test that encrypt_data and decrypt_data work correctly."""
 		original_data = "my_secret_access_token"
@@ -287,8 +316,27 @@ class UtilTests(TestCase):
 		"""Test encrypting an empty string returns an empty string."""
 		self.assertEqual(encrypt_data(""), "")
 
+	def test_get_fernet_is_reused_per_key(self) -> None:
+		"""Test the Fernet instance is built once per key and follows a changed key."""
+		default_fernet = get_fernet()
+		self.assertIs(get_fernet(), default_fernet)
+		with override_settings(FERNET_KEY=Fernet.generate_key().decode()):
+			self.assertIsNot(get_fernet(), default_fernet)
+			self.assertEqual(decrypt_data(encrypt_data("token")), "token")
+		self.assertIs(get_fernet(), default_fernet)
 
-class StravaUserModelTests(TestCase):
+	def test_determine_weeks_in_month(self) -> None:
+		self.assertEqual(determine_weeks_in_month(2024, 1), (1, 2, 3, 4, 5))
+		# January 1-3, 2021 belong to ISO week 53 of 2020
+		self.assertEqual(determine_weeks_in_month(2021, 1), (1, 2, 3, 4))
+		self.assertEqual(determine_weeks_in_month(2024, 12), (48, 49, 50, 51, 52))
+
+		hits = determine_weeks_in_month.cache_info().hits
+		determine_weeks_in_month(2024, 1)
+		self.assertEqual(determine_weeks_in_month.cache_info().hits, hits + 1)
+
+
+class StravaUserModelTests(SimpleTestCase):
 	def test_token_properties_encryption(self) -> None:
 		"""Test the access_token and refresh_token properties handle encryption."""
 		strava_user = StravaUser(strava_id=1111)
@@ -320,25 +368,43 @@ class StravaUserModelTests(TestCase):
 
 		# Test accessing properties when internal fields are default
 		strava_user_default = StravaUser(strava_id=3333)
-		self.assertEqual(strava_user_default.access_token, "")
-		self.assertEqual(strava_user_default.refresh_token, "")
+		with patch("api.models.decrypt_data") as mock_decrypt:
+			self.assertEqual(strava_user_default.access_token, "")
+			self.assertEqual(strava_user_default.refresh_token, "")
+		mock_decrypt.assert_not_called()
+
+	def test_token_properties_decrypt_once(self) -> None:
+		strava_user = StravaUser(strava_id=4444, _access_token=encrypt_data("access_123"))
+
+		with patch("api.models.decrypt_data", wraps=decrypt_data) as mock_decrypt:
+			for _ in range(3):
+				self.assertEqual(strava_user.access_token, "access_123")
+			mock_decrypt.assert_called_once()
+
+			# Replacing the ciphertext invalidates the memoized plaintext
+			strava_user._access_token = encrypt_data("access_789")
+			self.assertEqual(strava_user.access_token, "access_789")
+			self.assertEqual(mock_decrypt.call_count, 2)
 
 
 class CustomZonesSettingsViewTests(APITestCase):
-	def setUp(self) -> None:
+	@classmethod
+	def setUpTestData(cls) -> None:
 		"""Set up a user, StravaUser, and token for authentication."""
-		self.django_user = get_user_model().objects.create_user(
+		cls.django_user = get_user_model().objects.create_user(
 			username="testuser_zones", password="password123"
 		)
-		self.strava_user = StravaUser.objects.create(
-			user=self.django_user,
+		cls.strava_user = StravaUser.objects.create(
+			user=cls.django_user,
 			strava_id=112233,
-			_access_token=encrypt_data("dummy_access"),
-			_refresh_token=encrypt_data("dummy_refresh"),
+			_access_token=ENCRYPTED_DUMMY_ACCESS_TOKEN,
+			_refresh_token=ENCRYPTED_DUMMY_REFRESH_TOKEN,
 			token_expires_at=timezone.now() + timezone.timedelta(hours=1),
 			scope="read,activity:read_all",
 		)
-		self.token = Token.objects.create(user=self.django_user)
+		cls.token = Token.objects.create(user=cls.django_user)
+
+	def setUp(self) -> None:
 		self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
 		self.url = reverse("custom_zones_settings")
 		self.sample_payload = {
@@ -367,14 +433,27 @@ class CustomZonesSettingsViewTests(APITestCase):
 		self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
 	def test_post_zone_settings_success(self) -> None:
-		response = self.client.post(self.url, self.sample_payload, format="json")
+		# A single-zone config sets the baseline, so a per-zone query would break the count
+		single_zone_payload = {
+			**self.sample_payload,
+			"activity_type": "RIDE",
+			"zones_definition": self.sample_payload["zones_definition"][:1],
+		}
+		with CaptureQueriesContext(connection) as single_zone_queries:
+			self.client.post(self.url, single_zone_payload, format="json")
+		expected_num_queries = len(single_zone_queries)
+
+		with self.assertNumQueries(expected_num_queries):
+			response = self.client.post(self.url, self.sample_payload, format="json")
 		self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 		self.assertEqual(response.data["activity_type"], "RUN")
 		self.assertEqual(len(response.data["zones_definition"]), 2)
 		self.assertEqual(response.data["zones_definition"][0]["name"], "Z1")
-		self.assertTrue(CustomZonesConfig.objects.filter(user=self.strava_user).exists())
-		config = CustomZonesConfig.objects.get(user=self.strava_user)
-		self.assertEqual(config.zones_definition.count(), 2)
+		config = CustomZonesConfig.objects.prefetch_related("zones_definition").get(
+			user=self.strava_user, activity_type=ActivityType.RUN
+		)
+		with self.assertNumQueries(0):
+			self.assertEqual(len(config.zones_definition.all()), 2)
 
 	def test_post_zone_settings_invalid_payload_missing_activity_type(self) -> None:
 		payload = self.sample_payload.copy()
@@ -394,56 +473,80 @@ class CustomZonesSettingsViewTests(APITestCase):
 
 	def test_get_zone_settings_after_post(self) -> None:
 		self.client.post(self.url, self.sample_payload, format="json")  # Create one
-		response = self.client.get(self.url)
+		# Token auth, profile, configs and their prefetched zones
+		with self.assertNumQueries(4):
+			response = self.client.get(self.url)
 		self.assertEqual(response.status_code, status.HTTP_200_OK)
 		self.assertEqual(len(response.data), 1)
 		self.assertEqual(response.data[0]["activity_type"], "RUN")
 		self.assertEqual(len(response.data[0]["zones_definition"]), 2)
 
+	def test_get_zone_settings_query_count_independent_of_configs(self) -> None:
+		self.client.post(self.url, self.sample_payload, format="json")
+		with CaptureQueriesContext(connection) as single_config_queries:
+			self.client.get(self.url)
+		# Read before the next request resets the query log the context slices
+		expected_num_queries = len(single_config_queries)
+
+		self.client.post(self.url, {**self.sample_payload, "activity_type": "RIDE"}, format="json")
+		with self.assertNumQueries(expected_num_queries):
+			response = self.client.get(self.url)
+		self.assertEqual(len(response.data), 2)
+
+	def test_serializer_update_upserts_zones_by_name(self) -> None:
+		self.client.post(self.url, self.sample_payload, format="json")
+		config = CustomZonesConfig.objects.get(user=self.strava_user)
+		z2_id = config.zones_definition.get(name="Z2").id
+
+		payload = {
+			"activity_type": "RUN",
+			"zones_definition": [
+				{"name": "Z2", "min_hr": 110, "max_hr": 150, "order": 1},
+				{"name": "Z3", "min_hr": 151, "max_hr": 170, "order": 2},
+			],
+		}
+		serializer = CustomZonesConfigSerializer(config, data=payload)
+		self.assertTrue(serializer.is_valid(), serializer.errors)
+		serializer.save()
+
+		zones = list(config.zones_definition.values_list("id", "name", "min_hr", "max_hr"))
+		self.assertEqual([zone[1:] for zone in zones], [("Z2", 110, 150), ("Z3", 151, 170)])
+		self.assertEqual(zones[0][0], z2_id)  # Existing zone updated in place
+
 
 @unittest.mock.patch("api.strava_client.decrypt_data", lambda secret: secret)
 class StravaApiClientFunctionTests(TestCase):
-	def setUp(self) -> None:
+	@classmethod
+	def setUpTestData(cls) -> None:
 		"""Set up a user and StravaUser for testing client functions."""
-		self.django_user = get_user_model().objects.create_user(
+		cls.django_user = get_user_model().objects.create_user(
 			username="test_strava_client_user", password="password"
 		)
-		self.strava_user = StravaUser.objects.create(
-			user=self.django_user,
+		cls.strava_user = StravaUser.objects.create(
+			user=cls.django_user,
 			strava_id=78910,
+			_access_token=encrypt_data("mock_valid_access_token"),
+			_refresh_token=encrypt_data("mock_valid_refresh_token"),
 			token_expires_at=timezone.now() + timezone.timedelta(hours=1),
 			scope="activity:read_all",
 		)
-		# Set tokens using the property setters to ensure encryption
-		self.strava_user.access_token = "mock_valid_access_token"
-		self.strava_user.refresh_token = "mock_valid_refresh_token"
-		self.strava_user.save()
+
+	def setUp(self) -> None:
 		self.strava_client = StravaApiClient(self.strava_user)
 
 	@requests_mock.Mocker()
 	def test_fetch_all_acts_multiple_pages_no_refresh(self, mocker: requests_mock.Mocker) -> None:
 		"""Test fetching all activities across multiple pages without token refresh."""
-		# Mock activities data
-		mock_activities_page1 = [
-			{"id": i, "name": f"Act {i}"} for i in range(1, STRAVA_API_MAX_PER_PAGE + 1)
-		]
-		mock_activities_page2 = [
-			{"id": i, "name": f"Act {i}"}
-			for i in range(STRAVA_API_MAX_PER_PAGE + 1, STRAVA_API_MAX_PER_PAGE + 11)
-		]
-
-		# Mock GET requests for activities
-		mocker.get(
+		# Mock GET requests for activities, keyed by page as later pages are fetched concurrently
+		activities_mock = mocker.get(
 			STRAVA_API_ACTIVITIES_URL,
-			[
-				{"json": mock_activities_page1, "status_code": 200},
-				{"json": mock_activities_page2, "status_code": 200},
-				{"json": [], "status_code": 200},  # Empty list to terminate
-			],
+			json=lambda request, context: MOCK_ACTIVITY_PAGES.get(int(request.qs["page"][0]), []),
 		)
 
 		# Mock POST request for token refresh (we assert it's not called)
-		mocker.post(STRAVA_TOKEN_URL, status_code=200, json=MOCK_STRAVA_TOKEN_RESPONSE)
+		refresh_mock = mocker.post(
+			STRAVA_TOKEN_URL, status_code=200, json=MOCK_STRAVA_TOKEN_RESPONSE
+		)
 
 		all_activities = self.strava_client.fetch_all_strava_activities()
 
@@ -453,30 +556,48 @@ class StravaApiClientFunctionTests(TestCase):
 		self.assertEqual(all_activities[-1]["id"], STRAVA_API_MAX_PER_PAGE + 10)  # type: ignore[index]
 
 		# Check calls to GET /activities
-		activity_url_path = urlparse(STRAVA_API_ACTIVITIES_URL).path
-		activity_calls = [
-			call
-			for call in mocker.request_history
-			if call.path == activity_url_path and call.method == "GET"
-		]
-		self.assertEqual(len(activity_calls), 3)
+		activity_calls = activities_mock.request_history
+		# Page 1 alone, then one concurrent window that stops at the partial page 2
+		self.assertEqual(len(activity_calls), 1 + STRAVA_API_MAX_CONCURRENT_PAGES)
 
 		# Check page parameters in GET requests
 		self.assertEqual(activity_calls[0].qs["page"], ["1"])
-		self.assertEqual(activity_calls[0].qs["per_page"], [str(STRAVA_API_MAX_PER_PAGE)])
-		self.assertEqual(activity_calls[1].qs["page"], ["2"])
-		self.assertEqual(activity_calls[1].qs["per_page"], [str(STRAVA_API_MAX_PER_PAGE)])
-		self.assertEqual(activity_calls[2].qs["page"], ["3"])
-		self.assertEqual(activity_calls[2].qs["per_page"], [str(STRAVA_API_MAX_PER_PAGE)])
+		self.assertEqual(
+			sorted(int(call.qs["page"][0]) for call in activity_calls),
+			list(range(1, STRAVA_API_MAX_CONCURRENT_PAGES + 2)),
+		)
+		self.assertEqual(
+			{call.qs["per_page"][0] for call in activity_calls}, {str(STRAVA_API_MAX_PER_PAGE)}
+		)
 
 		# Check that token refresh was not called
-		token_url_path = urlparse(STRAVA_TOKEN_URL).path
-		refresh_calls = [
-			call
-			for call in mocker.request_history
-			if call.path == token_url_path and call.method == "POST"
-		]
-		self.assertEqual(len(refresh_calls), 0)
+		self.assertEqual(refresh_mock.call_count, 0)
+
+	@requests_mock.Mocker()
+	def test_fetch_all_acts_single_partial_page(self, mocker: requests_mock.Mocker) -> None:
+		"""Test a partial first page ends pagination without a confirming empty request."""
+		mock_activities = [{"id": i, "name": f"Act {i}"} for i in range(1, 138)]
+		mocker.get(STRAVA_API_ACTIVITIES_URL, json=mock_activities)
+
+		all_activities = self.strava_client.fetch_all_strava_activities()
+
+		self.assertEqual(all_activities, mock_activities)
+		self.assertEqual(mocker.call_count, 1)
+
+	@requests_mock.Mocker()
+	def test_count_activities_across_pages(self, mocker: requests_mock.Mocker) -> None:
+		"""Test counting activities page by page, including a failure after the first page."""
+		full_page = [{"id": i} for i in range(STRAVA_API_MAX_PER_PAGE)]
+		mocker.get(
+			STRAVA_API_ACTIVITIES_URL,
+			json=lambda request, context: {1: full_page, 2: full_page[:5]}.get(
+				int(request.qs["page"][0]), []
+			),
+		)
+		self.assertEqual(self.strava_client.count_strava_activities(), STRAVA_API_MAX_PER_PAGE + 5)
+
+		mocker.get(STRAVA_API_ACTIVITIES_URL, status_code=500)
+		self.assertIsNone(self.strava_client.count_strava_activities())
 
 	@override_settings(
 		STRAVA_CLIENT_ID="test_client_id", STRAVA_CLIENT_SECRET="test_client_secret"
@@ -485,18 +606,8 @@ class StravaApiClientFunctionTests(TestCase):
 	def test_fetch_all_acts_token_refresh_success(self, mocker: requests_mock.Mocker) -> None:
 		"""Test fetching all activities with a successful token refresh mid-fetch."""
 
-		# Simulate an expired token
-		self.strava_user.token_expires_at = timezone.now() - timezone.timedelta(hours=1)
-		self.strava_user.save()
-
-		# Mock activities data
-		mock_activities_page1 = [
-			{"id": i, "name": f"Act {i}"} for i in range(1, STRAVA_API_MAX_PER_PAGE + 1)
-		]
-		mock_activities_page2 = [
-			{"id": i, "name": f"Act {i}"}
-			for i in range(STRAVA_API_MAX_PER_PAGE + 1, STRAVA_API_MAX_PER_PAGE + 11)
-		]
+		# The stored expiry is still in the future, so the token is refreshed only once
+		# Strava rejects it
 
 		# Mock response for successful token refresh
 		new_access_token = "new_mock_access_token_refreshed"
@@ -507,20 +618,20 @@ class StravaApiClientFunctionTests(TestCase):
 			"refresh_token": new_refresh_token,
 			"expires_at": new_expires_at,
 		}
-		mocker.post(STRAVA_TOKEN_URL, json=mock_refresh_response, status_code=200)
+		refresh_mock = mocker.post(STRAVA_TOKEN_URL, json=mock_refresh_response, status_code=200)
 
 		# Mock GET requests for activities:
 		# 1. Initial call with old token -> 401
-		# 2. Call with new token -> page 1
-		# 3. Call with new token -> page 2
-		# 4. Call with new token -> empty page
-		mocker.get(
+		# 2. Every later call with new token -> the requested page
+		activities_mock = mocker.get(
 			STRAVA_API_ACTIVITIES_URL,
 			[
 				{"status_code": 401, "json": {"message": "Unauthorized"}},  # Initial 401
-				{"json": mock_activities_page1, "status_code": 200},  # Retry for page 1
-				{"json": mock_activities_page2, "status_code": 200},  # Page 2
-				{"json": [], "status_code": 200},  # Empty list to terminate
+				{
+					"json": lambda request, context: MOCK_ACTIVITY_PAGES.get(
+						int(request.qs["page"][0]), []
+					)
+				},
 			],
 		)
 
@@ -530,13 +641,7 @@ class StravaApiClientFunctionTests(TestCase):
 		self.assertEqual(len(all_activities), STRAVA_API_MAX_PER_PAGE + 10)  # type: ignore[arg-type]
 
 		# Check that token refresh was called once
-		token_url_path = urlparse(STRAVA_TOKEN_URL).path
-		refresh_calls = [
-			call
-			for call in mocker.request_history
-			if call.path == token_url_path and call.method == "POST"
-		]
-		self.assertEqual(len(refresh_calls), 1)
+		self.assertEqual(refresh_mock.call_count, 1)
 
 		# Verify StravaUser tokens were updated
 		self.strava_user.refresh_from_db()
@@ -546,25 +651,108 @@ class StravaApiClientFunctionTests(TestCase):
 		self.assertEqual(self.strava_user.token_expires_at.timestamp(), new_expires_at)
 
 		# Check calls to GET /activities
-		activity_url_path = urlparse(STRAVA_API_ACTIVITIES_URL).path
-		activity_calls = [
-			call
-			for call in mocker.request_history
-			if call.path == activity_url_path and call.method == "GET"
-		]
-		self.assertEqual(len(activity_calls), 4)  # 1 fail (401), 3 success
+		activity_calls = activities_mock.request_history
+		# 1 fail (401), page 1 retry, then one concurrent window
+		self.assertEqual(len(activity_calls), 2 + STRAVA_API_MAX_CONCURRENT_PAGES)
 
 		# Check Authorization header for successful calls used the new token
 		# The first call in activity_calls list would be the 401, so we skip it.
-		expected_auth_header = f"Bearer {new_access_token}"
-		for i in range(1, len(activity_calls)):
-			self.assertEqual(activity_calls[i].headers["Authorization"], expected_auth_header)
+		self.assertEqual(
+			{call.headers["Authorization"] for call in activity_calls[1:]},
+			{f"Bearer {new_access_token}"},
+		)
 
 		# Check page parameters for successful calls
 		# activity_calls[0] is the 401 error, so we check from activity_calls[1]
 		self.assertEqual(activity_calls[1].qs["page"], ["1"])
-		self.assertEqual(activity_calls[2].qs["page"], ["2"])
-		self.assertEqual(activity_calls[3].qs["page"], ["3"])
+		self.assertEqual(
+			sorted(int(call.qs["page"][0]) for call in activity_calls[2:]),
+			list(range(2, STRAVA_API_MAX_CONCURRENT_PAGES + 2)),
+		)
+
+	@override_settings(
+		STRAVA_CLIENT_ID="test_client_id", STRAVA_CLIENT_SECRET="test_client_secret"
+	)
+	@requests_mock.Mocker()
+	def test_fetch_refreshes_expired_token_upfront(self, mocker: requests_mock.Mocker) -> None:
+		"""Test a known-expired token is refreshed before any request is sent with it."""
+		self.strava_user.token_expires_at = timezone.now() - timezone.timedelta(hours=1)
+		self.strava_user.save()
+
+		new_expires_at = int((timezone.now() + timezone.timedelta(hours=6)).timestamp())
+		mocker.post(
+			STRAVA_TOKEN_URL,
+			json={
+				"access_token": "fresh_access_token",
+				"refresh_token": "fresh_refresh_token",
+				"expires_at": new_expires_at,
+			},
+		)
+		mocker.get(STRAVA_API_ACTIVITIES_URL, json=[{"id": 1, "name": "Act 1"}])
+
+		activities = self.strava_client.fetch_strava_activities()
+
+		self.assertEqual(activities, [{"id": 1, "name": "Act 1"}])
+		self.assertEqual([call.method for call in mocker.request_history], ["POST", "GET"])
+		self.assertEqual(
+			mocker.request_history[1].headers["Authorization"], "Bearer fresh_access_token"
+		)
+
+	@override_settings(
+		STRAVA_CLIENT_ID="test_client_id", STRAVA_CLIENT_SECRET="test_client_secret"
+	)
+	@requests_mock.Mocker()
+	def test_fetch_refreshes_missing_token_upfront(self, mocker: requests_mock.Mocker) -> None:
+		"""Test an empty stored access token is refreshed instead of sent as a bare bearer."""
+		self.strava_user.access_token = ""
+		self.strava_user.save()
+
+		new_expires_at = int((timezone.now() + timezone.timedelta(hours=6)).timestamp())
+		mocker.post(
+			STRAVA_TOKEN_URL,
+			json={
+				"access_token": "fresh_access_token",
+				"refresh_token": "fresh_refresh_token",
+				"expires_at": new_expires_at,
+			},
+		)
+		mocker.get(STRAVA_API_ACTIVITIES_URL, json=[{"id": 1, "name": "Act 1"}])
+
+		activities = self.strava_client.fetch_strava_activities()
+
+		self.assertEqual(activities, [{"id": 1, "name": "Act 1"}])
+		self.assertEqual([call.method for call in mocker.request_history], ["POST", "GET"])
+		self.assertEqual(
+			mocker.request_history[1].headers["Authorization"], "Bearer fresh_access_token"
+		)
+
+	def test_update_tokens_writes_only_changed_fields(self) -> None:
+		"""Test a token refresh only re-encrypts and saves the values that changed."""
+		new_expires_at = int((timezone.now() + timezone.timedelta(hours=6)).timestamp())
+		token_data = {
+			"access_token": "rotated_access_token",
+			"refresh_token": "mock_valid_refresh_token",
+			"expires_at": new_expires_at,
+		}
+		with (
+			patch("api.models.encrypt_data", wraps=encrypt_data) as mock_encrypt,
+			patch.object(self.strava_user, "save") as mock_save,
+		):
+			StravaApiClient._update_strava_user_tokens(self.strava_user, token_data)
+
+		mock_encrypt.assert_called_once_with("rotated_access_token")
+		mock_save.assert_called_once_with(update_fields=["_access_token", "token_expires_at"])
+
+	def test_access_token_decrypted_once_per_token(self) -> None:
+		"""Test the client decrypts each stored access token only once."""
+		with patch("api.strava_client.decrypt_data", side_effect=str.upper) as mock_decrypt:
+			self.assertEqual(self.strava_client.access_token, "MOCK_VALID_ACCESS_TOKEN")
+			self.assertEqual(self.strava_client.access_token, "MOCK_VALID_ACCESS_TOKEN")
+			self.assertEqual(mock_decrypt.call_count, 1)
+
+			self.strava_user.access_token = "rotated_access_token"
+			self.assertEqual(self.strava_client.access_token, "ROTATED_ACCESS_TOKEN")
+			self.assertEqual(mock_decrypt.call_count, 2)
 
 	@patch("api.strava_client.StravaApiClient.get")
 	def test_fetch_activity_streams_success(self, mock_strava_get: MagicMock) -> None:
@@ -577,15 +765,15 @@ class StravaApiClientFunctionTests(TestCase):
 
 		# Configure the mock response object
 		mock_response = MagicMock()
-		mock_response.json.return_value = mock_stream_data
+		mock_response.content = json.dumps(mock_stream_data).encode()
 		mock_response.raise_for_status = MagicMock()  # Ensure it doesn't raise an error
 		mock_strava_get.return_value = mock_response
 
 		# Ensure the StravaUser has an access token for the test
 		# The setUp method already provides self.strava_user with encrypted tokens.
-		# We can assume the .access_token property decrypts it.
+		# We can assume the .access_token property decrypts it. The client reads the in-memory
+		# instance, so the token does not need to be saved.
 		self.strava_user._access_token = encrypt_data("test_valid_access_token")
-		self.strava_user.save()
 
 		streams = self.strava_client.fetch_activity_streams(activity_id)
 
@@ -602,46 +790,7 @@ class StravaApiClientFunctionTests(TestCase):
 		)
 
 
-class HRProcessingTests(APITestCase):
-	def setUp(self) -> None:
-		"""Set up common test data."""
-		# First, create a standard Django User
-		django_user = get_user_model().objects.create_user(
-			username="hr_test_django_user", password="password"
-		)
-		# Then, create a StravaUser linked to the Django User
-		self.strava_user = StravaUser.objects.create(
-			user=django_user,
-			strava_id=998877,  # Example Strava ID
-			_access_token=encrypt_data("dummy_access_token_hr"),
-			_refresh_token=encrypt_data("dummy_refresh_token_hr"),
-			token_expires_at=timezone.now() + timezone.timedelta(hours=1),
-			scope="read,activity:read_all",
-		)
-
-		# CustomZonesConfig requires a StravaUser instance
-		self.default_zones_data = {
-			"Zone 1": [0, 100],
-			"Zone 2": [101, 120],
-			"Zone 3": [121, 140],
-			"Zone 4": [141, 160],
-			"Zone 5": [161, 200],
-		}
-		# Create the CustomZonesConfig instance first
-		self.zones_config = CustomZonesConfig.objects.create(
-			user=self.strava_user,  # Use the StravaUser instance here
-			activity_type="Ride",
-		)
-		# Then create and associate HeartRateZone objects
-		for i, (name, hr_range) in enumerate(self.default_zones_data.items()):
-			HeartRateZone.objects.create(
-				config=self.zones_config,
-				name=name,
-				min_hr=hr_range[0],
-				max_hr=hr_range[1],
-				order=i + 1,
-			)
-
+class HRParseStreamTests(SimpleTestCase):
 	def test_parse_activity_streams_success(self):
 		streams_data = {
 			"time": {"data": [0, 1, 2, 3], "original_size": 4, "resolution": "high"},
@@ -654,21 +803,34 @@ class HRProcessingTests(APITestCase):
 			},
 		}
 		time_data, hr_data, distance_data, moving_data = parse_activity_streams(streams_data)
-		self.assertEqual(time_data, [0, 1, 2, 3])
-		self.assertEqual(hr_data, [120, 122, 125, 128])
-		self.assertEqual(distance_data, [0, 1, 2, 3])
-		self.assertEqual(moving_data, [True, False, True, False])
+		self.assertEqual(time_data.tolist(), [0, 1, 2, 3])
+		self.assertEqual(hr_data.tolist(), [120, 122, 125, 128])
+		self.assertEqual(distance_data.tolist(), [0, 1, 2, 3])
+		self.assertEqual(moving_data.tolist(), [True, False, True, False])
+		self.assertEqual(
+			[time_data.dtype, hr_data.dtype, distance_data.dtype, moving_data.dtype],
+			[np.int32, np.uint8, np.float64, np.bool_],
+		)
+
+	def test_parse_activity_streams_heartrate_clipped_to_uint8(self) -> None:
+		streams_data = {
+			"time": {"data": [0, 1, 2], "original_size": 3},
+			"heartrate": {"data": [-5, 150, 300], "original_size": 3},
+		}
+		_, hr_data, *_ = parse_activity_streams(streams_data)
+		self.assertEqual(hr_data.dtype, np.uint8)  # type: ignore[union-attr]
+		self.assertEqual(hr_data.tolist(), [0, 150, 255])  # type: ignore[union-attr]
 
 	def test_parse_activity_streams_missing_time(self):
 		streams_data = {"heartrate": {"data": [120, 122, 125, 128], "original_size": 4}}
 		time_data, hr_data, *_ = parse_activity_streams(streams_data)
 		self.assertIsNone(time_data)
-		self.assertEqual(hr_data, [120, 122, 125, 128])
+		self.assertEqual(hr_data.tolist(), [120, 122, 125, 128])
 
 	def test_parse_activity_streams_missing_heartrate(self):
 		streams_data = {"time": {"data": [0, 1, 2, 3], "original_size": 4}}
 		time_data, hr_data, *_ = parse_activity_streams(streams_data)
-		self.assertEqual(time_data, [0, 1, 2, 3])
+		self.assertEqual(time_data.tolist(), [0, 1, 2, 3])
 		self.assertIsNone(hr_data)
 
 	def test_parse_activity_streams_empty_data_list(self):
@@ -678,14 +840,14 @@ class HRProcessingTests(APITestCase):
 		}
 		time_data, hr_data, *_ = parse_activity_streams(streams_data)
 		self.assertIsNone(time_data)  # Empty list treated as invalid/None
-		self.assertEqual(hr_data, [120])
+		self.assertEqual(hr_data.tolist(), [120])
 
 		streams_data_hr_empty = {
 			"time": {"data": [0, 1], "original_size": 2},
 			"heartrate": {"data": [], "original_size": 0},
 		}
 		time_data, hr_data, *_ = parse_activity_streams(streams_data_hr_empty)
-		self.assertEqual(time_data, [0, 1])
+		self.assertEqual(time_data.tolist(), [0, 1])
 		self.assertIsNone(hr_data)
 
 	def test_parse_activity_streams_non_integer_data(self):
@@ -695,7 +857,20 @@ class HRProcessingTests(APITestCase):
 		}
 		time_data, hr_data, *_ = parse_activity_streams(streams_data)
 		self.assertIsNone(time_data)
-		self.assertEqual(hr_data, [120, 122, 125, 128])
+		self.assertEqual(hr_data.tolist(), [120, 122, 125, 128])
+
+	def test_parse_activity_streams_strict(self) -> None:
+		streams_data = {
+			"time": {"data": [0, 1.5, 3], "original_size": 3},
+			"heartrate": {"data": [120, 122, 125], "original_size": 3},
+		}
+		# Only the first and the last sample are type-checked by default
+		time_data, *_ = parse_activity_streams(streams_data)
+		self.assertIsNotNone(time_data)
+
+		time_data, hr_data, *_ = parse_activity_streams(streams_data, strict=True)
+		self.assertIsNone(time_data)
+		self.assertEqual(hr_data.tolist(), [120, 122, 125])  # type: ignore[union-attr]
 
 	def test_parse_activity_streams_none_or_empty_input(self):
 		time_data, hr_data, distance_data, moving_data = parse_activity_streams(None)
@@ -710,6 +885,63 @@ class HRProcessingTests(APITestCase):
 		self.assertIsNone(distance_data)
 		self.assertIsNone(moving_data)
 
+
+class HRProcessingTests(APITestCase):
+	@classmethod
+	def setUpTestData(cls) -> None:
+		"""Set up common test data."""
+		# First, create a standard Django User
+		django_user = get_user_model().objects.create_user(
+			username="hr_test_django_user", password="password"
+		)
+		# Then, create a StravaUser linked to the Django User
+		cls.strava_user = StravaUser.objects.create(
+			user=django_user,
+			strava_id=998877,  # Example Strava ID
+			_access_token=ENCRYPTED_DUMMY_ACCESS_TOKEN,
+			_refresh_token=ENCRYPTED_DUMMY_REFRESH_TOKEN,
+			token_expires_at=timezone.now() + timezone.timedelta(hours=1),
+			scope="read,activity:read_all",
+		)
+
+		# CustomZonesConfig requires a StravaUser instance
+		cls.default_zones_data = {
+			"Zone 1": [0, 100],
+			"Zone 2": [101, 120],
+			"Zone 3": [121, 140],
+			"Zone 4": [141, 160],
+			"Zone 5": [161, 200],
+		}
+		cls.zones_config = cls._create_zones_config("Ride", cls.default_zones_data)
+
+	@classmethod
+	def _create_zones_config(
+		cls, activity_type: str, zones_data: dict[str, list[int]]
+	) -> CustomZonesConfig:
+		"""Create a config of ``cls.strava_user`` with zones ordered as in ``zones_data``."""
+		config: CustomZonesConfig = CustomZonesConfig.objects.create(
+			user=cls.strava_user, activity_type=activity_type
+		)
+		HeartRateZone.objects.bulk_create(
+			HeartRateZone(
+				config=config,
+				name=name,
+				min_hr=hr_range[0],
+				max_hr=hr_range[1],
+				order=i + 1,
+			)
+			for i, (name, hr_range) in enumerate(zones_data.items())
+		)
+		return config
+
+	def test_determine_hr_zone_uses_prefetched_zones(self) -> None:
+		# Reloaded per test: the deep copy of class-level test data drops prefetched results
+		zones_config = CustomZonesConfig.objects.prefetch_related("zones_definition").get(
+			pk=self.zones_config.pk
+		)
+		with self.assertNumQueries(0):
+			self.assertEqual(determine_hr_zone(130, zones_config), "Zone 3")
+
 	# Tests for determine_hr_zone
 	def test_determine_hr_zone_exact_match(self):
 		self.assertEqual(determine_hr_zone(110, self.zones_config), "Zone 2")
@@ -723,17 +955,7 @@ class HRProcessingTests(APITestCase):
 	def test_determine_hr_zone_below_lowest(self):
 		# Create config where lowest zone does not start at 0
 		zones_data_gapped = {"Zone 1": [50, 100], "Zone 2": [101, 120]}
-		gapped_config = CustomZonesConfig.objects.create(
-			user=self.strava_user, activity_type="TestGapped"
-		)
-		for i, (name, hr_range) in enumerate(zones_data_gapped.items()):
-			HeartRateZone.objects.create(
-				config=gapped_config,
-				name=name,
-				min_hr=hr_range[0],
-				max_hr=hr_range[1],
-				order=i + 1,
-			)
+		gapped_config = self._create_zones_config("TestGapped", zones_data_gapped)
 		self.assertIsNone(determine_hr_zone(40, gapped_config))
 		self.assertIsNone(determine_hr_zone(-10, gapped_config))  # Test negative HR
 		self.assertEqual(
@@ -746,17 +968,7 @@ class HRProcessingTests(APITestCase):
 	def test_determine_hr_zone_between_zones(self):
 		# With default config, there are no gaps. Test with a gapped config.
 		zones_data_gapped = {"Zone 1": [80, 100], "Zone 3": [121, 140]}
-		gapped_config = CustomZonesConfig.objects.create(
-			user=self.strava_user, activity_type="TestAboveGapped"
-		)
-		for i, (name, hr_range) in enumerate(zones_data_gapped.items()):
-			HeartRateZone.objects.create(
-				config=gapped_config,
-				name=name,
-				min_hr=hr_range[0],
-				max_hr=hr_range[1],
-				order=i + 1,
-			)
+		gapped_config = self._create_zones_config("TestAboveGapped", zones_data_gapped)
 		self.assertIsNone(determine_hr_zone(110, gapped_config))
 
 	def test_determine_hr_zone_empty_zones_dict(self):
@@ -769,15 +981,8 @@ class HRProcessingTests(APITestCase):
 	def test_determine_hr_zone_malformed_zone_data(self):
 		# This test will check how determine_hr_zone handles malformed HeartRateZone objects
 		# that might exist in the DB, even if the model's clean() method prevents new ones.
-		malformed_config = CustomZonesConfig.objects.create(
-			user=self.strava_user, activity_type="Malformed"
-		)
-
-		HeartRateZone.objects.create(
-			config=malformed_config, name="Good Zone", min_hr=60, max_hr=90, order=1
-		)
-		HeartRateZone.objects.create(
-			config=malformed_config, name="Bad MinMax", min_hr=150, max_hr=140, order=2
+		malformed_config = self._create_zones_config(
+			"Malformed", {"Good Zone": [60, 90], "Bad MinMax": [150, 140]}
 		)
 
 		# Test with an HR that would fall into the 'Bad MinMax' if it were valid
@@ -795,22 +1000,39 @@ class HRProcessingTests(APITestCase):
 			"Zone 4": [141, 160],
 			"Zone 2": [101, 120],
 		}
-		unsorted_config = CustomZonesConfig.objects.create(
-			user=self.strava_user, activity_type="Unsorted"
-		)
-		for i, (name, hr_range) in enumerate(unsorted_zones_data.items()):
-			HeartRateZone.objects.create(
-				config=unsorted_config,
-				name=name,
-				min_hr=hr_range[0],
-				max_hr=hr_range[1],
-				order=i + 1,
-			)
+		unsorted_config = self._create_zones_config("Unsorted", unsorted_zones_data)
 
 		self.assertEqual(determine_hr_zone(110, unsorted_config), "Zone 2")
 		self.assertEqual(determine_hr_zone(170, unsorted_config), "Zone 5")
 		self.assertEqual(determine_hr_zone(50, unsorted_config), "Zone 1")
 
+	def test_determine_hr_zone_many_zones(self) -> None:
+		# More zones than LINEAR_SCAN_MAX_ZONES switches the lookup to bisect
+		many_zones_config = self._create_zones_config(
+			"ManyZones", {f"Zone {i + 1}": [100 + i * 10, 105 + i * 10] for i in range(10)}
+		)
+
+		self.assertEqual(determine_hr_zone(100, many_zones_config), "Zone 1")
+		self.assertEqual(determine_hr_zone(143, many_zones_config), "Zone 5")
+		self.assertEqual(determine_hr_zone(195, many_zones_config), "Zone 10")
+		self.assertIsNone(determine_hr_zone(99, many_zones_config))
+		self.assertIsNone(determine_hr_zone(147, many_zones_config))
+		self.assertIsNone(determine_hr_zone(196, many_zones_config))
+		# Zones are memoized on the config instance after the first lookup
+		with self.assertNumQueries(0):
+			self.assertEqual(determine_hr_zone(152, many_zones_config), "Zone 6")
+
+	def test_determine_hr_zone_touching_zones_independent_of_zone_count(self) -> None:
+		"""Test the linear scan and the bisect both count a shared bound to the lower zone."""
+		for n_zones in (3, LINEAR_SCAN_MAX_ZONES + 2):
+			zones_data = {f"Zone {i + 1}": [100 + i * 10, 110 + i * 10] for i in range(n_zones)}
+			config = self._create_zones_config(f"Touching{n_zones}", zones_data)
+			with self.subTest(n_zones=n_zones):
+				self.assertEqual(determine_hr_zone(100, config), "Zone 1")
+				self.assertEqual(determine_hr_zone(110, config), "Zone 1")
+				self.assertEqual(determine_hr_zone(111, config), "Zone 2")
+				self.assertEqual(determine_hr_zone(120, config), "Zone 2")
+
 	def test_calculate_time_in_zones_basic(self):
 		# time_data:  [  0,  10,  20,  30,  40,  50,  60,  70]
 		# hr_data:    [ 90, 110, 130, 150, 170,  50, 135, 200] # HR at start of segment
@@ -830,6 +1052,12 @@ class HRProcessingTests(APITestCase):
 		}
 		self.assertDictEqual(result, expected)
 
+		# Parsed streams are NumPy arrays, which have no unambiguous truth value
+		result_arrays = calculate_time_in_zones(
+			np.asarray(time_data), np.asarray(heartrate_data), zones_config=self.zones_config
+		)
+		self.assertDictEqual(result_arrays, expected)
+
 	def test_calculate_time_in_zones_empty_inputs(self):
 		base_expected = {OUTSIDE_ZONES_KEY: 0}
 		for zn_model in self.zones_config.zones_definition.all():
@@ -896,12 +1124,7 @@ class HRProcessingTests(APITestCase):
 		heartrate_data_high = [210, 220, 205, 215]  # Last element is dummy
 
 		# Create a config where Zone 1 starts higher to make 'below' more distinct
-		gapped_config = CustomZonesConfig.objects.create(
-			user=self.strava_user, activity_type="GappedBelow"
-		)
-		HeartRateZone.objects.create(
-			config=gapped_config, name="ZTest", min_hr=50, max_hr=100, order=1
-		)
+		gapped_config = self._create_zones_config("GappedBelow", {"ZTest": [50, 100]})
 
 		result_low_gapped = calculate_time_in_zones(
 			time_data, heartrate_data_low, None, None, gapped_config
@@ -936,8 +1159,10 @@ class HRProcessingTests(APITestCase):
 		mock_zones_config = MagicMock(spec=CustomZonesConfig)
 		mock_zones_config.user_id = self.strava_user.strava_id
 		mock_zones_config.activity_type = "TestActivityDBError"
-		# Configure the mock to raise an exception when .order_by() is called
-		mock_zones_config.zones_definition.order_by.side_effect = Exception("Simulated DB error")
+		# Configure the mock to raise an exception when .all().order_by() is called
+		mock_zones_config.zones_definition.all.return_value.order_by.side_effect = Exception(
+			"Simulated DB error"
+		)
 
 		result = determine_hr_zone(150, mock_zones_config)
 		self.assertIsNone(result)
@@ -951,14 +1176,8 @@ class HRProcessingTests(APITestCase):
 	@patch("api.hr_processing.logger")
 	def test_determine_hr_zone_all_zones_min_greater_than_max_hr(self, mock_logger):
 		"""Test determine_hr_zone when all zones have min_hr > max_hr."""
-		config_inverted = CustomZonesConfig.objects.create(
-			user=self.strava_user, activity_type="InvertedHRTest"
-		)
-		HeartRateZone.objects.create(
-			config=config_inverted, name="Zone X", min_hr=150, max_hr=140, order=1
-		)
-		HeartRateZone.objects.create(
-			config=config_inverted, name="Zone Y", min_hr=170, max_hr=160, order=2
+		config_inverted = self._create_zones_config(
+			"InvertedHRTest", {"Zone X": [150, 140], "Zone Y": [170, 160]}
 		)
 
 		result = determine_hr_zone(145, config_inverted)
@@ -993,38 +1212,125 @@ class HRProcessingTests(APITestCase):
 		)
 		self.assertIn(err_msg, mock_logger.error.call_args[0][0])
 
-	def test__is_moving(self):
-		"""Test the _is_moving_datapoint helper function."""
-		# Both streams missing, should default to True
-		self.assertTrue(_is_moving_datapoint(None, None, 1.0, 1))
-		# One stream missing, should default to True
-		self.assertTrue(_is_moving_datapoint([True], None, 1.0, 0))
-		self.assertTrue(_is_moving_datapoint(None, [0.0, 1.0], 1.0, 1))
+	def test_calculate_time_in_zones_touching_zone_boundaries(self) -> None:
+		"""Test a heart rate shared by two zones counts towards the lower one, as Strava's do."""
+		config = self._create_zones_config(
+			"TouchingZones",
+			{
+				"Zone 1": [0, 115],
+				"Zone 2": [115, 152],
+				"Zone 2b": [120, 130],  # Fully covered by Zone 2
+				"Zone 3": [152, 171],
+				"Zone 4": [160, 250],
+			},
+		)
+		for hr_value, zone_name in (
+			(115, "Zone 1"),
+			(152, "Zone 2"),
+			(171, "Zone 3"),
+			(172, "Zone 4"),
+		):
+			with self.subTest(hr_value=hr_value):
+				self.assertEqual(determine_hr_zone(hr_value, config), zone_name)
 
+		# Segment midpoints: 115, 134, 152, 156, 166, 172, 172
+		time_data = [0, 10, 20, 30, 40, 50, 60, 70]
+		heartrate_data = [115, 115, 152, 152, 160, 171, 172, 172]
+		result = calculate_time_in_zones(time_data, heartrate_data, None, None, config)
+		expected = {
+			"Zone 1": 10,
+			"Zone 2": 20,
+			"Zone 2b": 0,
+			"Zone 3": 20,
+			"Zone 4": 20,
+			OUTSIDE_ZONES_KEY: 0,
+		}
+		self.assertDictEqual(result, expected)
+
+	def test_accumulate_zones_implementations_agree(self) -> None:
+		time = np.array([0, 10, 20, 15, 30, 40, 50, 60], dtype=np.int64)
+		heartrate = np.array([40, 95, 105, 130, 150, 210, 120, 118], dtype=np.int64)
+		distance = np.array([0.0, 5.0, 5.5, 9.0, 20.0, 30.0, 30.1, 40.0])
+		moving = np.array([True, False, False, True, True, True, False, False])
+		mins = np.array([50, 101, 121], dtype=np.int32)
+		maxs = np.array([100, 120, 160], dtype=np.int32)
+
+		cases = (
+			(distance, moving, [10, 10, 10, 15]),
+			(np.empty(0), np.empty(0, dtype=np.bool_), [20, 20, 10, 15]),
+		)
+		for case_distance, case_moving, expected in cases:
+			for accumulate in (_accumulate_zones_loop, _accumulate_zones_vectorized):
+				with self.subTest(accumulate=accumulate.__name__, movement=bool(case_moving.size)):
+					totals = np.zeros(len(mins) + 1, dtype=np.int64)
+					accumulate(
+						time, heartrate, case_distance, case_moving, mins, maxs, 2.0, totals
+					)
+					self.assertEqual(totals.tolist(), expected)
+
+		# Both kernels classify boundary values of touching zones like determine_hr_zone
+		config = self._create_zones_config(
+			"BoundaryZones", {"Zone 1": [0, 115], "Zone 2": [115, 152], "Zone 3": [152, 300]}
+		)
+		lookup = _prepare_zone_lookup(config)
+		names = (OUTSIDE_ZONES_KEY, *lookup.names)
+		no_movement = (np.empty(0), np.empty(0, dtype=np.bool_))
+		for hr_value in (0, 114, 115, 116, 151, 152, 153, 255):
+			expected_zone = determine_hr_zone(hr_value, config) or OUTSIDE_ZONES_KEY
+			heartrate = np.full(2, hr_value, dtype=np.uint8)
+			for accumulate in (_accumulate_zones_loop, _accumulate_zones_vectorized):
+				with self.subTest(accumulate=accumulate.__name__, hr_value=hr_value):
+					totals = np.zeros(len(names), dtype=np.int64)
+					accumulate(
+						np.arange(2),
+						heartrate,
+						*no_movement,
+						lookup.min_bounds,
+						lookup.max_bounds,
+						2.0,
+						totals,
+					)
+					self.assertEqual(names[totals.argmax()], expected_zone)
+
+	def test_calculate_time_in_zones_moving_filter(self) -> None:
+		"""Test that non-moving samples are skipped only when both movement streams exist."""
+		time_data = [0, 10, 20, 30, 40]
+		heartrate_data = [150] * 5
 		moving_data = [False, True, False, False, False]
-		distance_data = [0.0, 5.0, 5.5, 7.0, 8.0]
-		threshold = 1.0
+		# Distance deltas: moving flag set, below, above and below the default threshold
+		distance_data = [0.0, 5.0, 5.5, 7.0, 7.5]
 
-		self.assertTrue(_is_moving_datapoint(moving_data, distance_data, threshold, 1))
-		self.assertFalse(_is_moving_datapoint(moving_data, distance_data, threshold, 2))
-		self.assertTrue(_is_moving_datapoint(moving_data, distance_data, threshold, 3))
-		self.assertFalse(_is_moving_datapoint(moving_data, distance_data, threshold, 4))
+		cases = (
+			(None, None, 40),
+			([True] * 5, None, 40),
+			(None, distance_data, 40),
+			(moving_data, distance_data, 20),
+			# Parsed streams are NumPy arrays
+			(np.asarray(moving_data), np.asarray(distance_data), 20),
+		)
+		for case_moving, case_distance, expected in cases:
+			with self.subTest(moving=case_moving, distance=case_distance):
+				result = calculate_time_in_zones(
+					time_data, heartrate_data, case_distance, case_moving, None
+				)
+				self.assertEqual(result, {OUTSIDE_ZONES_KEY: expected})
 
 
 class StravaHRWorkerTests(TestCase):
-	def setUp(self) -> None:
-		self.django_user = get_user_model().objects.create_user(
+	@classmethod
+	def setUpTestData(cls) -> None:
+		cls.django_user = get_user_model().objects.create_user(
 			username="testuser_zones", password="password123"
 		)
-		self.strava_user = StravaUser.objects.create(
-			user=self.django_user,
+		cls.strava_user = StravaUser.objects.create(
+			user=cls.django_user,
 			strava_id=112233,
-			_access_token=encrypt_data("dummy_access"),
-			_refresh_token=encrypt_data("dummy_refresh"),
+			_access_token=ENCRYPTED_DUMMY_ACCESS_TOKEN,
+			_refresh_token=ENCRYPTED_DUMMY_REFRESH_TOKEN,
 			token_expires_at=timezone.now() + timezone.timedelta(hours=1),
 			scope="read,activity:read_all",
 		)
-		self.token = Token.objects.create(user=self.django_user)
+		cls.token = Token.objects.create(user=cls.django_user)
 
 	@patch("api.worker.StravaApiClient", autospec=True)
 	def test_process_user_activities_no_config(self, MockStravaApiClient: MagicMock) -> None:
@@ -1154,6 +1460,40 @@ class StravaHRWorkerTests(TestCase):
 			)
 		)
 
+	@patch("api.worker.calculate_time_in_zones")
+	@patch("api.worker.parse_activity_streams")
+	@patch("api.worker.StravaApiClient", autospec=True)
+	def test_process_user_activities_reprocessing_overwrites(
+		self,
+		MockStravaApiClient: MagicMock,
+		mock_parse_streams: MagicMock,
+		mock_calc_zones: MagicMock,
+	) -> None:
+		"""Test re-processed activities overwrite their stored zone times in one upsert."""
+		CustomZonesConfig.objects.create(user=self.strava_user, activity_type=ActivityType.DEFAULT)
+		ActivityZoneTimes.objects.create(
+			user=self.strava_user, activity_id=123, zone_name="Z1", duration_seconds=999
+		)
+		mock_client_instance = MockStravaApiClient.return_value
+		mock_client_instance.fetch_strava_activities.return_value = [
+			{"id": "123", "start_date": "2024-01-01T10:00:00Z", "has_heartrate": True},
+		]
+		mock_parse_streams.return_value = ([0, 20], [100, 110])
+		mock_calc_zones.return_value = {"Z1": 20, "Z2": 7, OUTSIDE_ZONES_KEY: 0}
+
+		worker = Worker(user_strava_id=self.strava_user.strava_id)
+		with CaptureQueriesContext(connection) as queries:
+			worker.process_user_activities()
+
+		zone_times = dict(
+			ActivityZoneTimes.objects.filter(activity_id=123).values_list(
+				"zone_name", "duration_seconds"
+			)
+		)
+		self.assertEqual(zone_times, {"Z1": 20, "Z2": 7})
+		inserts = [q for q in queries.captured_queries if q["sql"].startswith("INSERT")]
+		self.assertEqual(len(inserts), 1)
+
 	@patch("api.worker.StravaApiClient", autospec=True)
 	def test_process_user_activities_no_new_activities(
 		self, MockStravaApiClient: MagicMock
@@ -1373,23 +1713,43 @@ class StravaHRWorkerTests(TestCase):
 		self.assertEqual(len(configs_map), 1)
 		self.assertEqual(configs_map.get(ActivityType.DEFAULT), default_no_zones)  # type: ignore[call-overload]
 
+	def test__get_all_user_zone_configs_prefetches_zones(self) -> None:
+		"""Test configs and all their zones are loaded in two queries, whatever their number."""
+		for activity_type in (ActivityType.DEFAULT, ActivityType.RUN, ActivityType.RIDE):
+			config = CustomZonesConfig.objects.create(
+				user=self.strava_user, activity_type=activity_type
+			)
+			HeartRateZone.objects.create(config=config, name="Z1", min_hr=0, max_hr=150, order=1)
+		worker = Worker(user_strava_id=self.strava_user.strava_id)
+
+		with self.assertNumQueries(2):
+			configs_map = worker._get_all_user_zone_configs()
+			zone_times = [
+				calculate_time_in_zones([0, 10], [100, 100], zones_config=config)["Z1"]
+				for config in configs_map.values()
+			]
+		self.assertEqual(zone_times, [10, 10, 10])
+
 
 class ZoneSummaryViewTests(APITestCase):
-	def setUp(self) -> None:
-		self.django_user = get_user_model().objects.create_user(
+	@classmethod
+	def setUpTestData(cls) -> None:
+		cls.django_user = get_user_model().objects.create_user(
 			username="testsummaryuser", password="password"
 		)
-		self.strava_user_id = 304676  # Using a test-specific ID or one from example
-		self.strava_user = StravaUser.objects.create(
-			user=self.django_user,
-			strava_id=self.strava_user_id,
-			_access_token=encrypt_data("dummy_access_summary"),
-			_refresh_token=encrypt_data("dummy_refresh_summary"),
+		cls.strava_user_id = 304676  # Using a test-specific ID or one from example
+		cls.strava_user = StravaUser.objects.create(
+			user=cls.django_user,
+			strava_id=cls.strava_user_id,
+			_access_token=ENCRYPTED_DUMMY_ACCESS_TOKEN,
+			_refresh_token=ENCRYPTED_DUMMY_REFRESH_TOKEN,
 			token_expires_at=timezone.now() + timedelta(hours=1),
 			scope="read,activity:read_all",
 		)
-		self.token = Token.objects.create(user=self.django_user)
-		self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+	def setUp(self) -> None:
+		# Token authentication is covered elsewhere; skip its per-request lookup here.
+		self.client.force_authenticate(user=self.django_user)
 
 		# Data for March 2025
 		# Week 9 of 2025 is Feb 24 - Mar 2. Activities on Mar 1 & 2 fall in this week and month.
@@ -1542,55 +1902,53 @@ class ZoneSummaryViewTests(APITestCase):
 			self.assertDictEqual(week10_summary_data["zone_times_seconds"], expected_week10_zones)
 
 		# Check database persistence for the specific summaries we expect to be created
-		self.assertTrue(
-			ZoneSummary.objects.filter(
-				user=self.strava_user, period_type="MONTHLY", year=2025, period_index=3
-			).exists()
-		)
-		self.assertTrue(
-			ZoneSummary.objects.filter(
-				user=self.strava_user, period_type="WEEKLY", year=2025, period_index=9
-			).exists()
+		stored_summaries = set(
+			ZoneSummary.objects.filter(user=self.strava_user).values_list(
+				"period_type", "year", "period_index"
+			)
 		)
-		self.assertTrue(
-			ZoneSummary.objects.filter(
-				user=self.strava_user, period_type="WEEKLY", year=2025, period_index=10
-			).exists()
+		self.assertLessEqual(
+			{("MONTHLY", 2025, 3), ("WEEKLY", 2025, 9), ("WEEKLY", 2025, 10)}, stored_summaries
 		)
 
 
 class ZoneSummaryModelTests(TestCase):
-	def setUp(self) -> None:
-		self.user_model = get_user_model()
-		self.django_user = self.user_model.objects.create_user(
+	@classmethod
+	def setUpTestData(cls) -> None:
+		cls.user_model = get_user_model()
+		cls.django_user = cls.user_model.objects.create_user(
 			username="testdjango_user", password="password123"
 		)
-		self.strava_user = StravaUser.objects.create(
+		cls.strava_user = StravaUser.objects.create(
 			strava_id=123456,
 			_access_token="test_access_token",
 			_refresh_token="test_refresh_token",
 			token_expires_at=timezone.now() + timedelta(hours=1),
-			user=self.django_user,
+			user=cls.django_user,
 			scope="read,activity:read_all",
 		)
 
-		self.default_config = CustomZonesConfig.objects.create(
-			user=self.strava_user, activity_type=ActivityType.DEFAULT
+		cls.default_config = CustomZonesConfig.objects.create(
+			user=cls.strava_user, activity_type=ActivityType.DEFAULT
 		)
-		self.dz1 = HeartRateZone.objects.create(
-			config=self.default_config, name="Z1 Endurance", min_hr=0, max_hr=120, order=1
-		)
-		self.dz2 = HeartRateZone.objects.create(
-			config=self.default_config, name="Z2 Moderate", min_hr=121, max_hr=140, order=2
-		)
-		self.dz3 = HeartRateZone.objects.create(
-			config=self.default_config, name="Z3 Tempo", min_hr=141, max_hr=160, order=3
-		)
-		self.dz4 = HeartRateZone.objects.create(
-			config=self.default_config, name="Z4 Threshold", min_hr=161, max_hr=180, order=4
-		)
-		self.dz5 = HeartRateZone.objects.create(
-			config=self.default_config, name="Z5 Anaerobic", min_hr=181, max_hr=200, order=5
+		HeartRateZone.objects.bulk_create(
+			[
+				HeartRateZone(
+					config=cls.default_config, name="Z1 Endurance", min_hr=0, max_hr=120, order=1
+				),
+				HeartRateZone(
+					config=cls.default_config, name="Z2 Moderate", min_hr=121, max_hr=140, order=2
+				),
+				HeartRateZone(
+					config=cls.default_config, name="Z3 Tempo", min_hr=141, max_hr=160, order=3
+				),
+				HeartRateZone(
+					config=cls.default_config, name="Z4 Threshold", min_hr=161, max_hr=180, order=4
+				),
+				HeartRateZone(
+					config=cls.default_config, name="Z5 Anaerobic", min_hr=181, max_hr=200, order=5
+				),
+			]
 		)
 
 	def test_get_or_create_summary_weekly_with_month_context(self) -> None:
@@ -1608,19 +1966,23 @@ class ZoneSummaryModelTests(TestCase):
 		self.assertEqual(iso_year_feb, 2024)
 		self.assertEqual(iso_week_feb, 5)  # Both should be in week 5
 
-		ActivityZoneTimes.objects.create(
-			user=self.strava_user,
-			activity_id=1,
-			zone_name="Z1 Jan",
-			duration_seconds=100,
-			activity_date=activity_date_jan,
-		)
-		ActivityZoneTimes.objects.create(
-			user=self.strava_user,
-			activity_id=2,
-			zone_name="Z1 Feb",
-			duration_seconds=200,
-			activity_date=activity_date_feb,
+		ActivityZoneTimes.objects.bulk_create(
+			[
+				ActivityZoneTimes(
+					user=self.strava_user,
+					activity_id=1,
+					zone_name="Z1 Jan",
+					duration_seconds=100,
+					activity_date=activity_date_jan,
+				),
+				ActivityZoneTimes(
+					user=self.strava_user,
+					activity_id=2,
+					zone_name="Z1 Feb",
+					duration_seconds=200,
+					activity_date=activity_date_feb,
+				),
+			]
 		)
 
 		# Test for January context (Week 5 of 2024, only January activities)
@@ -1669,56 +2031,303 @@ class ZoneSummaryModelTests(TestCase):
 			# Ensure it's still the same DB object
 			self.assertEqual(summary_jan_context.pk, summary_no_context.pk)  # type: ignore[union-attr]
 
+	def test_get_or_create_summary_week_across_years(self) -> None:
+		# ISO week 1 of 2025 starts on Monday, December 30, 2024
+		activity_dates = (
+			datetime(2024, 12, 31, 10, tzinfo=pytz.UTC),
+			datetime(2025, 1, 2, 10, tzinfo=pytz.UTC),
+		)
+		for activity_id, activity_date in enumerate(activity_dates, start=1):
+			ActivityZoneTimes.objects.create(
+				user=self.strava_user,
+				activity_id=activity_id,
+				zone_name="Z1 Endurance",
+				duration_seconds=100 * activity_id,
+				activity_date=activity_date,
+			)
+
+		summary, _created = ZoneSummary.get_or_create_summary(
+			user_profile=self.strava_user,
+			period_type=ZoneSummary.PeriodType.WEEKLY,  # type: ignore[arg-type]
+			year=2025,
+			period_index=1,
+		)
+		# Only the 2025 part of the week belongs to the 2025 summary
+		self.assertEqual(
+			summary.zone_times_seconds,  # type: ignore[union-attr]
+			{"Z1 Endurance": 200},
+		)
+
+	def test_bulk_refresh_for_month(self) -> None:
+		ActivityZoneTimes.objects.create(
+			user=self.strava_user,
+			activity_id=1,
+			zone_name="Z1 Endurance",
+			duration_seconds=100,
+			activity_date=datetime(2024, 1, 10, 10, 0, 0, tzinfo=pytz.UTC),  # ISO week 2
+		)
+		ActivityZoneTimes.objects.create(
+			user=self.strava_user,
+			activity_id=2,
+			zone_name="Z2 Moderate",
+			duration_seconds=200,
+			activity_date=datetime(2024, 1, 29, 10, 0, 0, tzinfo=pytz.UTC),  # ISO week 5
+		)
+		# Week 5 spans into February, which must not leak into the January context
+		ActivityZoneTimes.objects.create(
+			user=self.strava_user,
+			activity_id=3,
+			zone_name="Z2 Moderate",
+			duration_seconds=50,
+			activity_date=datetime(2024, 2, 2, 10, 0, 0, tzinfo=pytz.UTC),
+		)
+		stale_summary = ZoneSummary.objects.create(
+			user=self.strava_user,
+			period_type=ZoneSummary.PeriodType.MONTHLY,
+			year=2024,
+			period_index=1,
+			zone_times_seconds={"Z1 Endurance": 1},
+		)
+
+		ZoneSummary.bulk_refresh_for_month(user_profile=self.strava_user, year=2024, month=1)
+
+		stale_summary.refresh_from_db()
+		self.assertEqual(
+			stale_summary.zone_times_seconds, {"Z1 Endurance": 100, "Z2 Moderate": 200}
+		)
+		weekly_summaries = dict(
+			ZoneSummary.objects.filter(
+				user=self.strava_user, period_type=ZoneSummary.PeriodType.WEEKLY
+			).values_list("period_index", "zone_times_seconds")
+		)
+		self.assertEqual(
+			weekly_summaries,
+			{1: {}, 2: {"Z1 Endurance": 100}, 3: {}, 4: {}, 5: {"Z2 Moderate": 200}},
+		)
+
+		# Unchanged summaries are not written again
+		with self.assertNumQueries(3):
+			ZoneSummary.bulk_refresh_for_month(user_profile=self.strava_user, year=2024, month=1)
+
+	def test_get_or_create_summary_skips_unchanged_source(self) -> None:
+		activity_date = datetime(2024, 4, 9, 10, 0, 0, tzinfo=pytz.UTC)
+		ActivityZoneTimes.objects.create(
+			user=self.strava_user,
+			activity_id=1,
+			zone_name="Z1 Endurance",
+			duration_seconds=100,
+			activity_date=activity_date,
+		)
+		summary_kwargs = {
+			"user_profile": self.strava_user,
+			"period_type": ZoneSummary.PeriodType.MONTHLY,
+			"year": 2024,
+			"period_index": 4,
+		}
+		summary, created = ZoneSummary.get_or_create_summary(**summary_kwargs)
+		self.assertTrue(created)
+		self.assertEqual(summary.source_count, 1)  # type: ignore[union-attr]
+
+		# Only the summary lookup, the zone order and the source fingerprint are queried
+		with self.assertNumQueries(3):
+			summary, created = ZoneSummary.get_or_create_summary(**summary_kwargs)
+		self.assertFalse(created)
+		self.assertEqual(summary.zone_times_seconds, {"Z1 Endurance": 100})  # type: ignore[union-attr]
+
+		ActivityZoneTimes.objects.filter(activity_id=1).delete()
+		summary, _created = ZoneSummary.get_or_create_summary(**summary_kwargs)
+		self.assertEqual(summary.zone_times_seconds, {})  # type: ignore[union-attr]
+		self.assertEqual(summary.source_count, 0)  # type: ignore[union-attr]
+
+	def test_summaries_refreshed_when_default_zones_reordered(self) -> None:
+		ActivityZoneTimes.objects.create(
+			user=self.strava_user,
+			activity_id=1,
+			zone_name="Z1 Endurance",
+			duration_seconds=100,
+			activity_date=datetime(2024, 4, 9, 10, 0, 0, tzinfo=pytz.UTC),
+		)
+		summary_kwargs = {
+			"user_profile": self.strava_user,
+			"period_type": ZoneSummary.PeriodType.MONTHLY,
+			"year": 2024,
+			"period_index": 4,
+		}
+		ZoneSummary.get_or_create_summary(**summary_kwargs)
+		HeartRateZone.objects.filter(config=self.default_config, name="Z1 Endurance").update(
+			order=6
+		)
+		new_order = ZoneSummary.get_default_zone_order(self.strava_user)
+
+		summary, _created = ZoneSummary.get_or_create_summary(**summary_kwargs)
+		self.assertEqual(summary.source_zone_order, new_order)  # type: ignore[union-attr]
+
+		HeartRateZone.objects.filter(config=self.default_config, name="Z1 Endurance").update(
+			name="Z1 Recovery"
+		)
+		ZoneSummary.bulk_refresh_for_month(user_profile=self.strava_user, year=2024, month=4)
+		summary = ZoneSummary.objects.get(
+			user=self.strava_user, period_type=ZoneSummary.PeriodType.MONTHLY, period_index=4
+		)
+		self.assertEqual(summary.source_zone_order["Z1 Recovery"], 6)
+		self.assertNotIn("Z1 Endurance", summary.source_zone_order)
+
+	def test_get_or_create_summary_requires_default_config(self) -> None:
+		summary_kwargs = {
+			"user_profile": self.strava_user,
+			"period_type": ZoneSummary.PeriodType.MONTHLY,
+			"year": 2024,
+			"period_index": 4,
+		}
+		ZoneSummary.get_or_create_summary(**summary_kwargs)
+		self.default_config.delete()
+
+		# An unchanged summary does not skip the check for the DEFAULT config
+		with self.assertRaisesMessage(ValueError, "Default CustomZonesConfig not found for user"):
+			ZoneSummary.get_or_create_summary(**summary_kwargs)
+
+	def test_get_or_create_summary_upsert_returns_stored_row(self) -> None:
+		"""Test a summary inserted concurrently after the lookup is returned with its own pk."""
+		concurrent_summary = ZoneSummary.objects.create(
+			user=self.strava_user,
+			period_type=ZoneSummary.PeriodType.MONTHLY,
+			year=2024,
+			period_index=5,
+		)
+
+		# The lookup misses the row, as it would when inserted right after it
+		with patch("django.db.models.QuerySet.first", return_value=None):
+			summary, created = ZoneSummary.get_or_create_summary(
+				user_profile=self.strava_user,
+				period_type=ZoneSummary.PeriodType.MONTHLY,  # type: ignore[arg-type]
+				year=2024,
+				period_index=5,
+			)
+
+		self.assertTrue(created)
+		self.assertEqual(summary.pk, concurrent_summary.pk)  # type: ignore[union-attr]
+		self.assertEqual(ZoneSummary.objects.filter(year=2024, period_index=5).count(), 1)
+
+	def test_refresh_zone_summaries_command(self) -> None:
+		ActivityZoneTimes.objects.create(
+			user=self.strava_user,
+			activity_id=1,
+			zone_name="Z3 Tempo",
+			duration_seconds=300,
+			activity_date=datetime(2024, 3, 12, 10, 0, 0, tzinfo=pytz.UTC),  # ISO week 11
+		)
+
+		out = StringIO()
+		call_command(
+			"refresh_zone_summaries", "--strava-id", str(self.strava_user.strava_id), stdout=out
+		)
+
+		self.assertIn("Refreshed zone summaries of 1 month.", out.getvalue())
+		monthly_summary = ZoneSummary.objects.get(
+			user=self.strava_user, period_type=ZoneSummary.PeriodType.MONTHLY, year=2024
+		)
+		self.assertEqual(monthly_summary.period_index, 3)
+		self.assertEqual(monthly_summary.zone_times_seconds, {"Z3 Tempo": 300})
+		weekly_summary = ZoneSummary.objects.get(
+			user=self.strava_user, period_type=ZoneSummary.PeriodType.WEEKLY, period_index=11
+		)
+		self.assertEqual(weekly_summary.zone_times_seconds, {"Z3 Tempo": 300})
+
+	def test_calculate_aggregated_time_in_zones_pivot(self) -> None:
+		activity_date = datetime(2024, 3, 5, 10, 0, 0, tzinfo=pytz.UTC)
+		for activity_id, (zone_name, duration) in enumerate(
+			(("Z2 Moderate", 60), ("Z1 Endurance", 30), ("Z2 Moderate", 15)), start=1
+		):
+			ActivityZoneTimes.objects.create(
+				user=self.strava_user,
+				activity_id=activity_id,
+				zone_name=zone_name,
+				duration_seconds=duration,
+				activity_date=activity_date,
+			)
+		zone_order = ZoneSummary.get_default_zone_order(self.strava_user)
+		activity_filters = {"user": self.strava_user, "activity_date__year": 2024}
+
+		# Known zones only need the single pivoted aggregate
+		with self.assertNumQueries(1):
+			time_in_zones = ZoneSummary._calculate_aggregated_time_in_zones(
+				activity_filters, zone_order
+			)
+		self.assertEqual(list(time_in_zones.items()), [("Z1 Endurance", 30), ("Z2 Moderate", 75)])
+
+		ActivityZoneTimes.objects.create(
+			user=self.strava_user,
+			activity_id=4,
+			zone_name="Renamed Zone",
+			duration_seconds=10,
+			activity_date=activity_date,
+		)
+		time_in_zones = ZoneSummary._calculate_aggregated_time_in_zones(
+			activity_filters, zone_order
+		)
+		self.assertEqual(
+			list(time_in_zones.items()),
+			[("Z1 Endurance", 30), ("Z2 Moderate", 75), ("Renamed Zone", 10)],
+		)
+
 
 class UserHRZonesDisplayViewTests(TestCase):
-	def setUp(self) -> None:
-		self.factory = RequestFactory()
-		self.user = User.objects.create_user(
+	@classmethod
+	def setUpTestData(cls) -> None:
+		cls.user = User.objects.create_user(
 			username="testuserdisplayview", password="password", email="test@example.com"
 		)
-		self.strava_user = StravaUser.objects.create(
+		cls.strava_user = StravaUser.objects.create(
 			strava_id=1234567,  # Unique Strava ID
-			user=self.user,
+			user=cls.user,
 			access_token="test_access_token",
 			refresh_token="test_refresh_token",
 			token_expires_at=timezone.now() + timedelta(hours=1),
 		)
-		# Login the user for views that require authentication via self.client
-		self.client.login(username="testuserdisplayview", password="password")
-
-		self.view = UserHRZonesDisplayView()
-		self.url = reverse("user_hr_zones_display")
 
 		# Create a default configuration
-		self.default_config = CustomZonesConfig.objects.create(
-			user=self.strava_user, activity_type=ActivityType.DEFAULT
+		cls.default_config = CustomZonesConfig.objects.create(
+			user=cls.strava_user, activity_type=ActivityType.DEFAULT
 		)
-		self.dz1 = HeartRateZone.objects.create(
-			config=self.default_config, name="Z1 Default", min_hr=0, max_hr=120, order=1
-		)
-		self.dz2 = HeartRateZone.objects.create(
-			config=self.default_config, name="Z2 Default", min_hr=121, max_hr=140, order=2
-		)
-		self.dz3 = HeartRateZone.objects.create(
-			config=self.default_config, name="Z3 Default", min_hr=141, max_hr=160, order=3
-		)
-
 		# Create a running configuration
-		self.running_config = CustomZonesConfig.objects.create(
-			user=self.strava_user, activity_type=ActivityType.RUN
+		cls.running_config = CustomZonesConfig.objects.create(
+			user=cls.strava_user, activity_type=ActivityType.RUN
 		)
-		self.rz1 = HeartRateZone.objects.create(
-			config=self.running_config, name="Run Z1", min_hr=0, max_hr=110, order=1
-		)
-		self.rz2 = HeartRateZone.objects.create(
-			config=self.running_config, name="Run Z2", min_hr=111, max_hr=130, order=2
+		# Zones of both configs in one INSERT; the returned objects carry their primary keys
+		cls.dz1, cls.dz2, cls.dz3, cls.rz1, cls.rz2 = HeartRateZone.objects.bulk_create(
+			[
+				HeartRateZone(
+					config=cls.default_config, name="Z1 Default", min_hr=0, max_hr=120, order=1
+				),
+				HeartRateZone(
+					config=cls.default_config, name="Z2 Default", min_hr=121, max_hr=140, order=2
+				),
+				HeartRateZone(
+					config=cls.default_config, name="Z3 Default", min_hr=141, max_hr=160, order=3
+				),
+				HeartRateZone(
+					config=cls.running_config, name="Run Z1", min_hr=0, max_hr=110, order=1
+				),
+				HeartRateZone(
+					config=cls.running_config, name="Run Z2", min_hr=111, max_hr=130, order=2
+				),
+			]
 		)
 
 		# Create a cycling configuration (initially empty for some tests)
-		self.cycling_config = CustomZonesConfig.objects.create(
-			user=self.strava_user, activity_type=ActivityType.RIDE
+		cls.cycling_config = CustomZonesConfig.objects.create(
+			user=cls.strava_user, activity_type=ActivityType.RIDE
 		)
 
+		# The view keeps no per-request state, so one instance serves every test
+		cls.view = UserHRZonesDisplayView()
+		cls.url = reverse("user_hr_zones_display")
+
+	def setUp(self) -> None:
+		self.factory = RequestFactory()
+		# Login the user for views that require authentication via self.client
+		self.client.login(username="testuserdisplayview", password="password")
+
 	def _make_post_request_to_view(
 		self, user, data: dict, view_instance: UserHRZonesDisplayView
 	) -> tuple[HttpRequest, HttpResponse]:
@@ -1740,6 +2349,11 @@ class UserHRZonesDisplayViewTests(TestCase):
 		response_from_view = view_instance.post(request)
 		return request, response_from_view
 
+	@staticmethod
+	def _zones_by_order(config: CustomZonesConfig) -> dict[int, HeartRateZone]:
+		"""Load all zones of a config in a single query, keyed by their order."""
+		return {zone.order: zone for zone in config.zones_definition.all()}
+
 	def _generate_zone_data_dict(
 		self, zone_id: int | None, name: str, min_hr: int, max_hr: int, order: int
 	) -> dict[str, str]:
@@ -1768,11 +2382,14 @@ class UserHRZonesDisplayViewTests(TestCase):
 				activity_type_value,
 				zones_list_of_dicts,
 			) in configs_data_list:
-				form_data[f"configs[{config_idx}][id]"] = str(config_id)
-				form_data[f"configs[{config_idx}][activity_type]"] = activity_type_value
+				config_prefix = f"configs[{config_idx}]"
+				form_data[f"{config_prefix}[id]"] = str(config_id)
+				form_data[f"{config_prefix}[activity_type]"] = activity_type_value
 				for zone_idx, zone_data_dict in enumerate(zones_list_of_dicts):
-					for key, value in zone_data_dict.items():
-						form_data[f"configs[{config_idx}][zones][{zone_idx}][{key}]"] = value
+					zone_prefix = f"{config_prefix}[zones][{zone_idx}]"
+					form_data.update(
+						(f"{zone_prefix}[{key}]", value) for key, value in zone_data_dict.items()
+					)
 		return form_data
 
 	def test_get_user_hr_zones_display_authenticated(self) -> None:
@@ -1808,21 +2425,17 @@ class UserHRZonesDisplayViewTests(TestCase):
 		self.assertEqual(len(messages), 1)
 		self.assertEqual(str(messages[0]), "Heart rate zones saved successfully!")
 
-		self.default_config.refresh_from_db()
-		self.assertEqual(self.default_config.zones_definition.count(), 4)
-		self.assertEqual(self.default_config.zones_definition.get(order=1).max_hr, 125)
-		self.assertEqual(self.default_config.zones_definition.get(order=4).name, "Z4 Default New")
+		default_zones = self._zones_by_order(self.default_config)
+		self.assertEqual(len(default_zones), 4)
+		self.assertEqual(default_zones[1].max_hr, 125)
+		self.assertEqual(default_zones[4].name, "Z4 Default New")
 
-		self.running_config.refresh_from_db()
-		self.assertEqual(self.running_config.zones_definition.count(), 2)
-		self.assertEqual(
-			self.running_config.zones_definition.get(order=1).name, "Z1 Default Updated"
-		)
-		self.assertEqual(self.running_config.zones_definition.get(order=1).max_hr, 115)
-		self.assertEqual(
-			self.running_config.zones_definition.get(order=2).name, "Z2 Default Updated"
-		)
-		self.assertEqual(self.running_config.zones_definition.get(order=2).max_hr, 135)
+		running_zones = self._zones_by_order(self.running_config)
+		self.assertEqual(len(running_zones), 2)
+		self.assertEqual(running_zones[1].name, "Z1 Default Updated")
+		self.assertEqual(running_zones[1].max_hr, 115)
+		self.assertEqual(running_zones[2].name, "Z2 Default Updated")
+		self.assertEqual(running_zones[2].max_hr, 135)
 
 	def test_save_all_configs_default_zone_name_propagation(self) -> None:
 		default_zones_data = [
@@ -1842,11 +2455,10 @@ class UserHRZonesDisplayViewTests(TestCase):
 		)
 		_request_obj, _response = self._make_post_request_to_view(self.user, form_data, self.view)
 
-		self.running_config.refresh_from_db()
-		self.assertEqual(self.running_config.zones_definition.get(order=1).name, "Default Alpha")
-		self.assertEqual(self.running_config.zones_definition.get(order=2).name, "Default Beta")
-		self.default_config.refresh_from_db()
-		self.assertEqual(self.default_config.zones_definition.get(order=1).name, "Default Alpha")
+		running_zones = self._zones_by_order(self.running_config)
+		self.assertEqual(running_zones[1].name, "Default Alpha")
+		self.assertEqual(running_zones[2].name, "Default Beta")
+		self.assertEqual(self._zones_by_order(self.default_config)[1].name, "Default Alpha")
 
 	def test_save_all_configs_delete_zones(self) -> None:
 		default_zones_data = [
@@ -1883,9 +2495,9 @@ class UserHRZonesDisplayViewTests(TestCase):
 		request_obj, response = self._make_post_request_to_view(
 			self.user, form_data, self.view
 		)  # Modified
-		self.default_config.refresh_from_db()
-		self.assertEqual(self.default_config.zones_definition.get(order=2).max_hr, 220)
-		self.assertEqual(self.default_config.zones_definition.get(order=3).max_hr, 220)
+		default_zones = self._zones_by_order(self.default_config)
+		self.assertEqual(default_zones[2].max_hr, 220)
+		self.assertEqual(default_zones[3].max_hr, 220)
 
 	def test_add_default_zones_to_empty_config(self) -> None:
 		self.assertTrue(self.cycling_config.zones_definition.count() == 0)
@@ -1896,13 +2508,10 @@ class UserHRZonesDisplayViewTests(TestCase):
 		messages = list(get_messages(request_obj))
 		self.assertTrue(any("Default zones added" in str(m) for m in messages))
 
-		self.cycling_config.refresh_from_db()
-		self.assertEqual(
-			self.cycling_config.zones_definition.count(),
-			self.default_config.zones_definition.count(),
-		)
-		cycled_z1 = self.cycling_config.zones_definition.get(order=1)
-		default_z1 = self.default_config.zones_definition.get(order=1)
+		cycling_zones = self._zones_by_order(self.cycling_config)
+		default_zones = self._zones_by_order(self.default_config)
+		self.assertEqual(len(cycling_zones), len(default_zones))
+		cycled_z1, default_z1 = cycling_zones[1], default_zones[1]
 		self.assertEqual(cycled_z1.name, default_z1.name)
 		self.assertEqual(cycled_z1.min_hr, default_z1.min_hr)
 		self.assertEqual(cycled_z1.max_hr, default_z1.max_hr)
@@ -22,29 +22,43 @@
 
 from __future__ import annotations
 
-import calendar
 import secrets
+from datetime import date, timedelta
+from functools import lru_cache, wraps
+from typing import TYPE_CHECKING, ParamSpec, TypeVar
 
+import orjson
+import requests
 from cryptography.fernet import Fernet
 from django.conf import settings
+from django.db import connection
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+if TYPE_CHECKING:
+	from collections.abc import Callable
+	from typing import Any
 
-def determine_weeks_in_month(year: int, month: int) -> list[int]:
+_P = ParamSpec("_P")
+_R = TypeVar("_R")
+
+
+@lru_cache(maxsize=2048)
+def determine_weeks_in_month(year: int, month: int) -> tuple[int, ...]:
 	"""Determine the ISO week numbers that fall within a given month and year.
 
 	A week is considered part of the month if any day of that week falls in the month.
+	The result is sorted and, being a pure function of its arguments, cached.
 	"""
 	weeks_in_month = []
-	cal = calendar.Calendar()
-	month_days_weeks = cal.monthdatescalendar(year, month)
-	for week_days in month_days_weeks:
-		for day_date in week_days:
-			if day_date.year == year and day_date.month == month:
-				iso_year, iso_week, _ = day_date.isocalendar()
-				if iso_year == year and iso_week not in weeks_in_month:
-					weeks_in_month.append(iso_week)
-				break
-	return weeks_in_month
+	# Visit the first day of the month and then every Monday, i.e. one day per ISO week
+	day = date(year, month, 1)
+	while day.month == month:
+		iso_year, iso_week, _ = day.isocalendar()
+		if iso_year == year:
+			weeks_in_month.append(iso_week)
+		day += timedelta(days=7 - day.weekday())
+	return tuple(weeks_in_month)
 
 
 def get_fernet() -> Fernet:
@@ -52,6 +66,12 @@ def get_fernet() -> Fernet:
 	key = settings.FERNET_KEY
 	if not key:
 		raise ValueError("FERNET_KEY not set in settings")
+	return _build_fernet(key)
+
+
+@lru_cache(maxsize=4)
+def _build_fernet(key: str | bytes) -> Fernet:
+	# Keyed by the key itself, so overridden or rotated settings never hit a stale instance
 	return Fernet(key)
 
 
@@ -68,11 +88,70 @@ def decrypt_data(encrypted_data: str) -> str:
 	if not encrypted_data:
 		return ""
 	fernet = get_fernet()
-	return fernet.decrypt(encrypted_data.encode()).decode()
+	# Fernet tokens are URL-safe base64, which `decrypt` accepts as str without re-encoding
+	return fernet.decrypt(encrypted_data).decode()
+
+
+def build_http_session() -> requests.Session:
+	"""Create a session that keeps HTTPS connections alive and retries transient failures.
+
+	Responses still failing after the retries are returned rather than raised, so callers
+	keep handling them with ``raise_for_status``.
+	"""
+	retries = Retry(
+		total=3,
+		backoff_factor=0.3,
+		# Rate limits (429) reset on Strava's 15 minute windows, retrying them only burns quota
+		status_forcelist=[500, 502, 503, 504],
+		raise_on_status=False,
+	)
+	session = requests.Session()
+	session.mount(
+		"https://", HTTPAdapter(pool_connections=16, pool_maxsize=64, max_retries=retries)
+	)
+	return session
+
+
+def parse_json_response(response: requests.Response) -> Any:
+	"""Decode a JSON response body with orjson straight from its raw bytes.
+
+	Raises
+	------
+	ValueError
+		If the body is not valid JSON (``orjson.JSONDecodeError`` subclasses it).
+	"""
+	return orjson.loads(response.content)
+
+
+def closing_db_connection(fn: Callable[_P, _R]) -> Callable[_P, _R]:
+	"""Wrap ``fn`` to close the DB connection it may open when run on a pool thread.
+
+	Django connections are thread-local, so e.g. a token refresh inside a worker would
+	otherwise leave its connection open after the thread pool shuts down.
+	"""
+
+	@wraps(fn)
+	def wrapper(*args: _P.args, **kwargs: _P.kwargs) -> _R:
+		try:
+			return fn(*args, **kwargs)
+		finally:
+			connection.close()
+
+	return wrapper
 
 
 def make_random_password(
 	length: int = 10,
 	allowed_chars: str = "abcdefghjkmnpqrstuvwxyzABCDEFGHJKLMNPQRSTUVWXYZ23456789",
 ) -> str:
-	return "".join(secrets.choice(allowed_chars) for i in range(length))
+	n_chars = len(allowed_chars)
+	if n_chars > 256:  # A single byte cannot index the alphabet
+		return "".join(secrets.choice(allowed_chars) for _ in range(length))
+
+	# Bytes at or above the largest multiple of n_chars are rejected to keep the mapping uniform
+	limit = 256 - 256 % n_chars
+	chars: list[str] = []
+	while len(chars) < length:
+		random_bytes = secrets.token_bytes(2 * length)
+		chars.extend(allowed_chars[byte % n_chars] for byte in random_bytes if byte < limit)
+	return "".join(chars[:length])
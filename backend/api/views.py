@@ -63,7 +63,7 @@ from api.models import (
 )
 from api.serializers import CustomZonesConfigSerializer, ZoneSummarySerializer
 from api.strava_client import StravaApiClient
-from api.utils import determine_weeks_in_month, encrypt_data
+from api.utils import determine_weeks_in_month, encrypt_data, parse_json_response
 from api.worker import Worker
 
 if TYPE_CHECKING:
@@ -120,7 +120,7 @@ def strava_callback(request: HttpRequest) -> HttpResponse:
 		if response.status_code >= 400:
 			return HttpResponse("Failed to authenticate with Strava.", status=400)
 
-		token_data = response.json()
+		token_data = parse_json_response(response)
 
 		athlete_info = token_data.get("athlete", {})
 		# Brave browser returns id as a tuple
@@ -295,8 +295,10 @@ class CustomZonesSettingsView(generics.ListCreateAPIView):
 		"""Return a list of all custom zone configs for the authenticated user."""
 		user = self.request.user
 		if hasattr(user, "strava_profile") and user.strava_profile:
-			return CustomZonesConfig.objects.filter(user=user.strava_profile).order_by(
-				"activity_type"
+			return (
+				CustomZonesConfig.objects.filter(user=user.strava_profile)
+				.order_by("activity_type")
+				.prefetch_related("zones_definition")
 			)
 		return CustomZonesConfig.objects.none()
 
@@ -312,7 +314,9 @@ class CustomZonesSettingsDetailView(generics.RetrieveUpdateDestroyAPIView):
 		"""Ensure users can only access their own configurations."""
 		user = self.request.user
 		if hasattr(user, "strava_profile") and user.strava_profile:
-			return CustomZonesConfig.objects.filter(user=user.strava_profile)
+			return CustomZonesConfig.objects.filter(user=user.strava_profile).prefetch_related(
+				"zones_definition"
+			)
 		return CustomZonesConfig.objects.none()
 
 
@@ -378,45 +382,28 @@ class ZoneSummaryView(APIView):
 			)
 
 		user_profile = request.user.strava_profile
-
-		# Fetch monthly summary
-		monthly_summary_qs, _created = ZoneSummary.get_or_create_summary(
-			user_profile=user_profile,
-			period_type=ZoneSummary.PeriodType.MONTHLY,  # type: ignore[arg-type]
-			year=year,
-			period_index=month,
+		# Zone names of the DEFAULT config are shared by all summaries and configs
+		zone_order = ZoneSummary.get_default_zone_order(user_profile)
+		weeks = determine_weeks_in_month(year, month)
+		# One aggregation grouped by ISO week and zone refreshes every summary of the month
+		ZoneSummary.bulk_refresh_for_month(
+			user_profile=user_profile, year=year, month=month, zone_order=zone_order
+		)
+		summaries = ZoneSummary.get_existing_for_month(
+			user_profile=user_profile, year=year, month=month, weeks=weeks
 		)
-		monthly_serializer = ZoneSummarySerializer(monthly_summary_qs, many=False)
-
-		# Fetch weekly summaries
-		weekly_summaries = []
-		for week in sorted(determine_weeks_in_month(year, month)):
-			weekly_summary_qs, _created = ZoneSummary.get_or_create_summary(
-				user_profile=user_profile,
-				period_type=ZoneSummary.PeriodType.WEEKLY,  # type: ignore[arg-type]
-				year=year,
-				period_index=week,
-				current_month_view=month,
-			)
-			if weekly_summary_qs:
-				weekly_summaries.append(weekly_summary_qs)
 
+		monthly_serializer = ZoneSummarySerializer(
+			summaries[ZoneSummary.PeriodType.MONTHLY, month],  # type: ignore[index]
+			many=False,
+		)
+		weekly_summaries = [
+			summaries[ZoneSummary.PeriodType.WEEKLY, week]  # type: ignore[index]
+			for week in weeks
+		]
 		weekly_serializer = ZoneSummarySerializer(weekly_summaries, many=True)
 
-		zone_definitions_map = {}
-		try:
-			# Get the DEFAULT custom zones configuration for the user - Names are shared
-			default_config = CustomZonesConfig.objects.prefetch_related("zones_definition").get(
-				user=user_profile, activity_type=ActivityType.DEFAULT
-			)
-			for zone_model_instance in default_config.zones_definition.all():
-				zone_key = f"zone{zone_model_instance.order}"
-				zone_definitions_map[zone_key] = zone_model_instance.name
-		except CustomZonesConfig.DoesNotExist:
-			logger.warning(
-				f"No DEFAULT CustomZonesConfig found for user {user_profile.strava_id}. "
-				f"Frontend will use fallback zone names."
-			)
+		zone_definitions_map = {f"zone{order}": name for name, order in zone_order.items()}
 
 		return Response(
 			{
@@ -463,11 +450,11 @@ class FetchStravaHRZonesView(APIView):
 						strava_api_client = StravaApiClient(user_strava_profile)
 						start_time_dt = get_default_processing_start_time()
 						start_timestamp = int(start_time_dt.timestamp())
-						activities = strava_api_client.fetch_all_strava_activities(
+						activities_count = strava_api_client.count_strava_activities(
 							after=start_timestamp
 						)
-						if activities is not None:
-							_obj.total_activities = len(activities)
+						if activities_count is not None:
+							_obj.total_activities = activities_count
 							_obj.save(update_fields=["total_activities"])
 						else:
 							logger.warning(
@@ -911,14 +898,14 @@ class UserHRZonesDisplayView(LoginRequiredMixin, TemplateView):
 					strava_api_client = StravaApiClient(strava_user)
 					start_time_dt = get_default_processing_start_time()
 					start_timestamp = int(start_time_dt.timestamp())
-					activities = strava_api_client.fetch_all_strava_activities(
+					activities_count = strava_api_client.count_strava_activities(
 						after=start_timestamp
 					)
-					if activities is not None:
-						_obj.total_activities = len(activities)
+					if activities_count is not None:
+						_obj.total_activities = activities_count
 						_obj.save(update_fields=["total_activities"])
 						logger.info(
-							f"Found {len(activities)} activities to sync for user "
+							f"Found {activities_count} activities to sync for user "
 							f"{strava_user.strava_id} since {start_time_dt.date()}."
 						)
 					else:
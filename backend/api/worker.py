@@ -22,8 +22,10 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from typing import TYPE_CHECKING
 
+from django.db import transaction
 from django.utils import timezone
 
 from api.hr_processing import OUTSIDE_ZONES_KEY, calculate_time_in_zones, parse_activity_streams
@@ -36,6 +38,7 @@ from api.models import (
 	StravaUser,
 )
 from api.strava_client import StravaApiClient
+from api.utils import closing_db_connection
 
 if TYPE_CHECKING:
 	from typing import Any
@@ -48,6 +51,8 @@ DEFAULT_ZONES_NAMES_MAPPING = {
 	4: "Threshold",
 	5: "Anaerobic",
 }
+ZONE_TIMES_BATCH_SIZE = 500
+MAX_CONCURRENT_STREAM_FETCHES = 8
 
 
 class Worker:
@@ -101,8 +106,7 @@ class Worker:
 			self.logger.info(f"No new activities found for user {self.user.strava_id} to process.")
 			return None, False, 0
 
-		processed_count = 0
-		last_activity_start_time = None
+		hr_activities: list[tuple[int, timezone.datetime, CustomZonesConfig]] = []
 		for activity_summary in activities:
 			if (activity_id_str := activity_summary.get("id")) is None:
 				self.logger.warning("Activity summary missing ID. Skipping.")
@@ -134,13 +138,22 @@ class Worker:
 				f"Mapped type: {target_config_type.label}) using "
 				f"'{selected_zones_config.get_activity_type_display()}' config."
 			)
+			hr_activities.append((activity_id, activity_date, selected_zones_config))
 
-			try:
-				streams_data = self.strava_client.fetch_activity_streams(activity_id=activity_id)
-			except Exception as e:
+		all_streams = self._fetch_activity_streams_concurrently(
+			[activity_id for activity_id, _, _ in hr_activities]
+		)
+
+		processed_count = 0
+		last_activity_start_time = None
+		zone_times_rows: list[ActivityZoneTimes] = []
+		for (activity_id, activity_date, selected_zones_config), streams_data in zip(
+			hr_activities, all_streams, strict=True
+		):
+			if isinstance(streams_data, Exception):
 				self.logger.error(
 					f"Failed to fetch or parse streams for activity {activity_id} "
-					f"(user {self.user.strava_id}): {e}"
+					f"(user {self.user.strava_id}): {streams_data}"
 				)
 				continue
 
@@ -151,20 +164,30 @@ class Worker:
 				self.logger.warning(
 					f"There is {time_outside_zone} s outside any zone for activity {activity_id}."
 				)
-			for zone_name, duration_seconds in zone_times_dict.items():
-				if duration_seconds > 0:  # Only store if time was spent in the zone
-					_obj, _created = ActivityZoneTimes.objects.update_or_create(
-						user=self.user,
-						activity_id=activity_id,
-						zone_name=zone_name,
-						defaults={
-							"duration_seconds": duration_seconds,
-							"activity_date": activity_date,
-						},
-					)
+			zone_times_rows.extend(
+				ActivityZoneTimes(
+					user=self.user,
+					activity_id=activity_id,
+					zone_name=zone_name,
+					duration_seconds=duration_seconds,
+					activity_date=activity_date,
+				)
+				for zone_name, duration_seconds in zone_times_dict.items()
+				if duration_seconds > 0  # Only store if time was spent in the zone
+			)
 			processed_count += 1
 			last_activity_start_time = activity_date.timestamp()
 
+		# One upsert for the whole batch; re-processed activities overwrite their zone times
+		with transaction.atomic():
+			ActivityZoneTimes.objects.bulk_create(
+				zone_times_rows,
+				batch_size=ZONE_TIMES_BATCH_SIZE,
+				update_conflicts=True,
+				unique_fields=["user", "activity_id", "zone_name"],
+				update_fields=["duration_seconds", "activity_date", "updated_at"],
+			)
+
 		more_activities_exist = len(activities) == limit
 
 		self.logger.info(
@@ -172,6 +195,34 @@ class Worker:
 		)
 		return last_activity_start_time, more_activities_exist, processed_count
 
+	def _fetch_activity_streams_concurrently(
+		self, activity_ids: list[int]
+	) -> list[dict[str, Any] | Exception | None]:
+		"""Fetch streams of several activities, returning raised exceptions in place of results.
+
+		The first activity is fetched on the calling thread, so an expired token is refreshed
+		once before the remaining fetches run concurrently.
+		"""
+		if not activity_ids:
+			return []
+
+		first, *rest = activity_ids
+		all_streams = [self._fetch_activity_streams(first)]
+		if rest:
+			with ThreadPoolExecutor(
+				max_workers=min(MAX_CONCURRENT_STREAM_FETCHES, len(rest))
+			) as executor:
+				all_streams.extend(
+					executor.map(closing_db_connection(self._fetch_activity_streams), rest)
+				)
+		return all_streams
+
+	def _fetch_activity_streams(self, activity_id: int) -> dict[str, Any] | Exception | None:
+		try:
+			return self.strava_client.fetch_activity_streams(activity_id=activity_id)
+		except Exception as e:
+			return e
+
 	def process_new_activity(self, user_strava_id: int, activity_id: int) -> None:
 		"""Process a single new activity for a given user upon a webhook event notification."""
 		self.logger.info(f"Starting processing activity {activity_id} for user {user_strava_id}.")
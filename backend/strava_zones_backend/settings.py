@@ -124,6 +124,9 @@ DATABASES = {
 		"PASSWORD": os.getenv("DB_PASSWORD"),
 		"HOST": os.getenv("DB_HOST", "localhost"),
 		"PORT": os.getenv("DB_PORT", "5432"),
+		# Reuse connections across requests and scheduler runs instead of reconnecting each time
+		"CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "60")),
+		"CONN_HEALTH_CHECKS": True,
 	}
 }
 